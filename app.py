@@ -7,17 +7,63 @@ and uploading data to Supabase. It's designed to work on Render's free tier.
 """
 
 import os
+import re
 import sys
 import time
 import json
+import queue
+import atexit
+import hashlib
+import functools
 import logging
+import logging.handlers
 import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import (
+    Flask, Response, render_template, request, redirect, url_for, session,
+    stream_template, stream_with_context
+)
+
+# orjson is much faster than the stdlib encoder for the frequently polled API
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Hand over to gunicorn so `python app.py` deployments get the production server.
+# This happens before any startup below, so no TaskMaster or logging threads are
+# started (and lost) in a process that is about to be replaced.
+if __name__ == "__main__" and os.environ.get("FLASK_ENV") != "development":
+    config_path = str(Path(__file__).with_name("gunicorn_conf.py"))
+    os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "-c", config_path, "app:app"])
+
+# Configure logging before importing taskmaster so its basicConfig() is a no-op.
+# Request and worker threads only enqueue records; a listener thread does the
+# file and console I/O.
+log_queue = queue.SimpleQueue()
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler("web_app.log"),
+    logging.FileHandler("taskmaster.log"),
+    logging.StreamHandler(sys.stdout),
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+root_logger = logging.getLogger()
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+root_logger.setLevel(logging.INFO)
+
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger("web_app")
 
 # Import the taskmaster for job management
 from taskmaster import TaskMaster, Job, JobStatus
@@ -28,23 +74,37 @@ from config import (
     DEFAULT_BRANCHES, DEFAULT_SECTIONS, DEFAULT_SETTINGS
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("web_app.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger("web_app")
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "nbkrist_student_portal_secret_key")
 
+# Evaluated once; the environment doesn't change while the app is running
+IS_RAILWAY = 'RAILWAY_ENVIRONMENT' in os.environ
+
+# Submitted form fields and the defaults used when they are missing
+FORM_DEFAULTS = (
+    ('username', USERNAME),
+    ('password', PASSWORD),
+    ('academic_year', DEFAULT_ACADEMIC_YEARS[0]),
+    ('semester', DEFAULT_SEMESTERS[0]),
+    ('branch', DEFAULT_BRANCHES[0]),
+    ('section', DEFAULT_SECTIONS[0]),
+)
+
+# Scripts that can be run from the web interface
+ALLOWED_SCRIPTS = frozenset({
+    'attendance_scraper.py',
+    'mid_marks_scraper.py',
+    'personal_details_scraper.py',
+    'direct_supabase_uploader.py',
+})
+
+# Scripts that accept the --force-requests parameter
+FORCE_REQUESTS_SCRIPTS = frozenset({'personal_details_scraper.py'})
+
 # Check if running on Railway and set environment variables
-if 'RAILWAY_ENVIRONMENT' in os.environ:
+if IS_RAILWAY:
     # Force requests-based scraping on Railway to reduce memory usage
     os.environ['FORCE_REQUESTS_SCRAPING'] = 'true'
 
@@ -56,69 +116,196 @@ if 'RAILWAY_ENVIRONMENT' in os.environ:
 # Initialize the TaskMaster
 task_master = TaskMaster()
 
-# Create temp directory for data storage
-TEMP_DATA_DIR = Path("/tmp/student_details")
+class SnapshotCache:
+    """Memoize a rendered payload until the job list changes.
+
+    While jobs are changing the payload is rebuilt at most once every `ttl`
+    seconds, so many open tabs share a single serialization.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.version = None
+        self.timestamp = 0.0
+        self.payload = None
+
+    def get(self, version: int, build):
+        """Return the cached payload, rebuilding it with `build()` if stale."""
+        with self.lock:
+            now = time.monotonic()
+            if self.payload is None or (self.version != version and now - self.timestamp >= self.ttl):
+                self.payload = build()
+                self.version = version
+                self.timestamp = now
+            return self.payload
+
+def ttl_cache(seconds: float):
+    """Decorator caching the result of a zero-argument function for `seconds`."""
+    def decorator(func):
+        lock = threading.Lock()
+        cache = {"expires": 0.0, "value": None}
+
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                now = time.monotonic()
+                if now >= cache["expires"]:
+                    cache["value"] = func()
+                    cache["expires"] = now + seconds
+                return cache["value"]
+        return wrapper
+    return decorator
+
+# Job ids are ULIDs (see taskmaster.new_job_id)
+JOB_ID_RE = re.compile(r'[0-7][0-9A-HJKMNP-TV-Z]{25}')
+
+def require_valid_job_id(json_errors: bool = False):
+    """Decorator rejecting malformed job ids with a 404 before any job lookup.
+
+    Args:
+        json_errors: Return a JSON error body instead of plain text
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(job_id, *args, **kwargs):
+            if not JOB_ID_RE.fullmatch(job_id):
+                if json_errors:
+                    return ojsonify({"error": "Job not found"}, status=404)
+                return "Job not found", 404
+            return view(job_id, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# Recent submissions, so a double-clicked or retried form post reuses the job
+# it already started instead of spawning the same scrapers twice
+SUBMISSION_DEDUP_SECONDS = 60
+recent_submissions: Dict[tuple, tuple] = {}
+recent_submissions_lock = threading.Lock()
+
+def find_duplicate_submission(key: tuple, now: float) -> Optional[Job]:
+    """Return a still-active job created for the same submission key, if any.
+
+    Also drops expired entries. Must be called with recent_submissions_lock held.
+    """
+    for stale_key in [k for k, (created, _) in recent_submissions.items()
+                      if now - created >= SUBMISSION_DEDUP_SECONDS]:
+        del recent_submissions[stale_key]
+
+    entry = recent_submissions.get(key)
+    if not entry:
+        return None
+    job = task_master.get_job(entry[1])
+    if job and job.status in (JobStatus.PENDING, JobStatus.RUNNING):
+        return job
+    return None
+
+# Cached snapshots of the job lists served by api_jobs() and api_dashboard()
+JOBS_CACHE_TTL = 2.0
+jobs_cache = SnapshotCache(JOBS_CACHE_TTL)
+dashboard_cache = SnapshotCache(JOBS_CACHE_TTL)
+
+# The index page only depends on constants, so it is rendered once on first use
+_index_shell: Optional[bytes] = None
+
+# Server-Sent Events settings for the job status stream. A stream pins a
+# gunicorn thread, so it only stays open long enough to deliver the first
+# snapshot and any quick follow-ups, then hands the page to ETag polling.
+SSE_MAX_STREAM_SECONDS = 5
+SSE_RETRY_MS = 2000
+
+# Browser cache lifetimes for /api/status responses
+STATUS_MAX_AGE_ACTIVE = 1
+STATUS_MAX_AGE_FINISHED = 30
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values the stdlib encoder doesn't handle natively."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dump_json(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes, using orjson when available.
+
+    Naive datetimes are emitted as-is (local time, no offset), matching
+    `datetime.isoformat()`.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_json_default).encode('utf-8')
+
+def ojsonify(obj: Any, status: int = 200) -> Response:
+    """Drop-in replacement for `jsonify` backed by `dump_json`."""
+    return Response(dump_json(obj), status=status, mimetype='application/json')
+
+# Create temp directory for data storage. DATA_DIR can point this at a tmpfs
+# mount such as /dev/shm to keep intermediate scraper output off the disk.
+TEMP_DATA_DIR = Path(os.environ.get("DATA_DIR", DEFAULT_SETTINGS["data_dir"]))
 TEMP_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 @app.route('/')
 def index():
-    """Render the main page with the form for running scripts."""
-    return render_template(
-        'index.html',
-        academic_years=DEFAULT_ACADEMIC_YEARS,
-        semesters=DEFAULT_SEMESTERS,
-        branches=DEFAULT_BRANCHES,
-        sections=DEFAULT_SECTIONS,
-        active_jobs=task_master.get_active_jobs(),
-        completed_jobs=task_master.get_completed_jobs(limit=5)
-    )
+    """Render the main page with the form for running scripts.
+
+    Job lists are loaded by the page from /api/dashboard.
+    """
+    global _index_shell
+    if _index_shell is None:
+        _index_shell = render_template(
+            'index.html',
+            academic_years=DEFAULT_ACADEMIC_YEARS,
+            semesters=DEFAULT_SEMESTERS,
+            branches=DEFAULT_BRANCHES,
+            sections=DEFAULT_SECTIONS
+        ).encode('utf-8')
+    return Response(_index_shell, mimetype='text/html')
 
 @app.route('/submit', methods=['POST'])
 def submit_job():
     """Handle form submission and create a new job."""
-    # Get form data
-    username = request.form.get('username', USERNAME)
-    password = request.form.get('password', PASSWORD)
-    academic_year = request.form.get('academic_year', DEFAULT_ACADEMIC_YEARS[0])
-    semester = request.form.get('semester', DEFAULT_SEMESTERS[0])
-    branch = request.form.get('branch', DEFAULT_BRANCHES[0])
-    section = request.form.get('section', DEFAULT_SECTIONS[0])
-
-    # Get selected scripts
-    selected_scripts = request.form.getlist('scripts')
+    form = request.form
+
+    # Get selected scripts, dropping unknown names and duplicates but keeping
+    # the order they were selected in
+    selected_scripts = list(dict.fromkeys(
+        script for script in form.getlist('scripts') if script in ALLOWED_SCRIPTS
+    ))
     if not selected_scripts:
-        return jsonify({"error": "No scripts selected"}), 400
-
-    # Create a new job
-    params = {
-        "username": username,
-        "password": password,
-        "academic_year": academic_year,
-        "semester": semester,
-        "branch": branch,
-        "section": section,
+        return ojsonify({"error": "No scripts selected"}, status=400)
+
+    # Create a new job from the form data
+    params = {key: form.get(key, default) for key, default in FORM_DEFAULTS}
+    params.update({
         "data_dir": str(TEMP_DATA_DIR),
         "headless": True,  # Always use headless mode
-        "workers": 1,  # Use single worker for stability
         "max_retries": 5,  # Increase retries for better reliability
         "timeout": 60,  # Increase timeout for slower connections
-    }
+    })
 
     # Add Railway-specific parameters
-    if 'RAILWAY_ENVIRONMENT' in os.environ:
+    if IS_RAILWAY:
         # Use lower memory settings on Railway
         # Only add force-requests parameter for personal_details_scraper.py
-        if 'personal_details_scraper.py' in selected_scripts:
+        if not FORCE_REQUESTS_SCRIPTS.isdisjoint(selected_scripts):
             params["force_requests"] = True
             logger.info("Adding force_requests=True parameter for personal_details_scraper.py on Railway")
         # For other scripts, we'll use the environment variable approach without adding the parameter
         # This is because attendance_scraper.py and mid_marks_scraper.py don't have a --force-requests parameter
         logger.info(f"Using FORCE_REQUESTS_SCRAPING=true environment variable for scripts on Railway")
 
-    job = task_master.create_job(
-        scripts=selected_scripts,
-        params=params
-    )
+    submission_key = tuple(params[key] for key, _ in FORM_DEFAULTS) + tuple(selected_scripts)
+    with recent_submissions_lock:
+        now = time.monotonic()
+        duplicate = find_duplicate_submission(submission_key, now)
+        if duplicate:
+            logger.info(f"Duplicate submission, reusing job {duplicate.id}")
+            return redirect(url_for('job_status', job_id=duplicate.id))
+
+        job = task_master.create_job(
+            scripts=selected_scripts,
+            params=params
+        )
+        recent_submissions[submission_key] = (now, job.id)
 
     # Start the job (TaskMaster will handle queueing)
     task_master.start_job(job.id)
@@ -127,6 +314,7 @@ def submit_job():
     return redirect(url_for('job_status', job_id=job.id))
 
 @app.route('/status/<job_id>')
+@require_valid_job_id()
 def job_status(job_id):
     """Show the status of a specific job."""
     job = task_master.get_job(job_id)
@@ -135,65 +323,180 @@ def job_status(job_id):
 
     return render_template('status.html', job=job)
 
+def job_status_payload(job: Job, since: Optional[int] = None) -> Dict[str, Any]:
+    """Build the status payload shared by the polling and streaming endpoints.
+
+    Args:
+        job: The job
+        since: Log sequence number the client already has; only newer log
+            lines are included. None returns the last 50 lines.
+
+    Returns:
+        Dictionary ready to be serialized as JSON
+    """
+    logs, log_seq, logs_reset = job.logs_since(since, limit=50)
+    return {
+        "id": job.id,
+        "status": job.status.value,
+        "scripts": job.scripts,
+        "current_script": job.current_script,
+        "progress": job.progress,
+        "start_time": job.start_time,
+        "end_time": job.end_time,
+        "logs": logs,
+        "log_seq": log_seq,
+        "logs_reset": logs_reset,
+    }
+
 @app.route('/api/status/<job_id>')
+@require_valid_job_id(json_errors=True)
 def api_job_status(job_id):
     """API endpoint to get the status of a job."""
     job = task_master.get_job(job_id)
     if not job:
-        return jsonify({"error": "Job not found"}), 404
+        return ojsonify({"error": "Job not found"}, status=404)
+
+    # Cheap fingerprint of everything the payload shows, so unchanged polls skip serialization
+    etag = hashlib.blake2b(
+        f"{job.status.value}|{job.progress}|{job.log_seq}|{job.current_script}".encode('utf-8'),
+        digest_size=8
+    ).hexdigest()
+    finished = job.status not in (JobStatus.PENDING, JobStatus.RUNNING)
+    cache_control = f"private, max-age={STATUS_MAX_AGE_FINISHED if finished else STATUS_MAX_AGE_ACTIVE}"
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = ojsonify(job_status_payload(job, since=request.args.get('since', type=int)))
+
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+@app.route('/api/stream/<job_id>')
+@require_valid_job_id(json_errors=True)
+def api_job_stream(job_id):
+    """Server-Sent Events endpoint that pushes job updates as they happen."""
+    job = task_master.get_job(job_id)
+    if not job:
+        return ojsonify({"error": "Job not found"}, status=404)
+
+    try:
+        last_event_id = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        last_event_id = None
+
+    def generate():
+        # Tell the browser how long to wait before reconnecting
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+
+        version = None
+        log_seq = last_event_id
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            current_version = task_master.wait_for_job_update(job, version, timeout=remaining)
+            if current_version == version:
+                continue
+
+            version = current_version
+            status = job_status_payload(job, since=log_seq)
+            log_seq = status["log_seq"]
+            payload = dump_json(status).decode('utf-8')
+            # The event id lets a reconnecting EventSource resume from the last log line
+            yield f"id: {log_seq}\nevent: job_update\ndata: {payload}\n\n"
+
+            # Stop streaming once the job has reached a final state
+            if job.status not in (JobStatus.PENDING, JobStatus.RUNNING):
+                return
+
+        # Tell the page to close the stream and poll /api/status from log_seq on,
+        # rather than reconnecting and holding another thread
+        yield f"event: poll\ndata: {dump_json({'log_seq': log_seq}).decode('utf-8')}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
 
-    return jsonify({
+@app.route('/api/jobs')
+def api_jobs():
+    """API endpoint to get all jobs."""
+    def build_payload() -> bytes:
+        active_jobs = task_master.get_active_jobs()
+        completed_jobs = task_master.get_completed_jobs(limit=10)
+        return dump_json({
+            "active_jobs": [job.to_dict() for job in active_jobs],
+            "completed_jobs": [job.to_dict() for job in completed_jobs],
+        })
+
+    return Response(jobs_cache.get(task_master.version, build_payload), mimetype='application/json')
+
+def dashboard_job_summary(job: Job) -> Dict[str, Any]:
+    """Build the subset of job fields shown in the index page job lists."""
+    return {
         "id": job.id,
         "status": job.status.value,
         "scripts": job.scripts,
-        "current_script": job.current_script,
         "progress": job.progress,
-        "start_time": job.start_time.isoformat() if job.start_time else None,
-        "end_time": job.end_time.isoformat() if job.end_time else None,
-        "logs": job.logs[-50:],  # Return the last 50 log entries
-    })
+        "start_time": job.start_time,
+        "end_time": job.end_time,
+    }
 
-@app.route('/api/jobs')
-def api_jobs():
-    """API endpoint to get all jobs."""
-    active_jobs = task_master.get_active_jobs()
-    completed_jobs = task_master.get_completed_jobs(limit=10)
+@app.route('/api/dashboard')
+def api_dashboard():
+    """API endpoint with the active and recent jobs shown on the index page."""
+    def build_payload() -> bytes:
+        return dump_json({
+            "active": [dashboard_job_summary(job) for job in task_master.get_active_jobs()],
+            "completed": [dashboard_job_summary(job) for job in task_master.get_completed_jobs(limit=5)],
+        })
 
-    return jsonify({
-        "active_jobs": [job.to_dict() for job in active_jobs],
-        "completed_jobs": [job.to_dict() for job in completed_jobs],
-    })
+    return Response(dashboard_cache.get(task_master.version, build_payload), mimetype='application/json')
+
+@ttl_cache(1.0)
+def cached_worker_status() -> Dict[str, Any]:
+    """Worker status, refreshed at most once per second."""
+    return task_master.get_worker_status()
 
 @app.route('/api/worker-status')
 def api_worker_status():
     """API endpoint to get the status of the worker thread."""
-    return jsonify(task_master.get_worker_status())
+    return ojsonify(cached_worker_status())
 
 @app.route('/api/restart-worker', methods=['POST'])
 def api_restart_worker():
     """API endpoint to restart the worker thread."""
-    return jsonify(task_master.restart_worker())
+    return ojsonify(task_master.restart_worker())
 
 @app.route('/api/restart-monitor', methods=['POST'])
 def api_restart_monitor():
     """API endpoint to restart the monitor thread."""
-    return jsonify(task_master.restart_monitor())
+    return ojsonify(task_master.restart_monitor())
 
 @app.route('/cancel/<job_id>', methods=['POST'])
+@require_valid_job_id(json_errors=True)
 def cancel_job(job_id):
     """Cancel a running job with PIN protection."""
     # Check for the admin PIN
     admin_pin = request.form.get('admin_pin')
     if admin_pin != '9640':
-        return jsonify({"error": "Invalid admin PIN"}), 403
+        return ojsonify({"error": "Invalid admin PIN"}, status=403)
 
     success = task_master.cancel_job(job_id)
     if not success:
-        return jsonify({"error": "Failed to cancel job"}), 400
+        return ojsonify({"error": "Failed to cancel job"}, status=400)
 
     return redirect(url_for('job_status', job_id=job_id))
 
 @app.route('/results/<job_id>')
+@require_valid_job_id()
 def job_results(job_id):
     """Show the results of a completed job."""
     job = task_master.get_job(job_id)
@@ -203,9 +506,10 @@ def job_results(job_id):
     if job.status != JobStatus.COMPLETED:
         return redirect(url_for('job_status', job_id=job_id))
 
-    return render_template('results.html', job=job)
+    # Stream the page so the browser can start rendering while the rest is generated
+    return Response(stream_template('results.html', job=job), mimetype='text/html')
 
 if __name__ == "__main__":
-    import os
+    # Development server; other environments were handed to gunicorn at the top
     port = int(os.environ.get("PORT", 10000))
-    app.run(host="0.0.0.0", port=port)
+    app.run(host="0.0.0.0", port=port, threaded=True)
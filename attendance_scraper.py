@@ -10,49 +10,69 @@ import os
 import sys
 import logging
 import argparse
+import importlib.util
+import atexit
 import json
+import re
 import time
-import queue
+import itertools
+import tempfile
 import threading
 import multiprocessing
 import concurrent.futures
 from pathlib import Path
+from urllib.parse import urlsplit
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple, Union
-from functools import wraps
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+from functools import lru_cache, wraps
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 
-# Import Selenium for browser automation
+# Prefer the C-based lxml parser; fall back to the pure-Python parser if it's missing
 try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# orjson serializes the per-student JSON files much faster than the stdlib encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Selenium (browser automation) is optional and slow to import, so only check
+# it is installed here; it is imported when first used
+SELENIUM_AVAILABLE = importlib.util.find_spec('selenium') is not None
+
+
+def load_selenium():
+    """
+    Import the Selenium names used by the browser code paths into this module.
+
+    Called before the first browser is started, so runs that never need the
+    browser don't pay for importing Selenium.
+    """
+    global webdriver, Options, By, WebDriverWait, EC, TimeoutException
     from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
-    print("Warning: Selenium is not installed. Browser automation will not be available.")
-
-# Make pandas optional
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    print("Warning: pandas is not installed. CSV/Excel export functionality will be limited.")
+    from selenium.common.exceptions import TimeoutException
 
 # Import login utilities and configuration
-from login_utils import create_session, login, BASE_URL
+from login_utils import (
+    create_session, login, is_logged_in, save_session_cookies, load_session_cookies, BASE_URL
+)
 from config import (
     USERNAME, PASSWORD, ATTENDANCE_PORTAL_URL,
     DEFAULT_ACADEMIC_YEARS, DEFAULT_SEMESTERS,
     DEFAULT_BRANCHES, DEFAULT_SECTIONS,
-    YEAR_SEM_CODES, BRANCH_CODES, DEFAULT_SETTINGS
+    YEAR_SEM_CODES, BRANCH_CODES, BRANCH_KEYS, DEFAULT_SETTINGS
 )
 
 # Configure logging
@@ -67,6 +87,316 @@ logging.basicConfig(
 logger = logging.getLogger("attendance_scraper")
 
 
+# Tags needed from the attendance landing page: the filter form and its fields.
+# Everything else (scripts, styles, navigation) is skipped while parsing.
+FORM_STRAINER = SoupStrainer(['form', 'select', 'option', 'input', 'table'])
+
+# Tags needed from a results page: every extraction approach only looks inside
+# tables, so nothing outside them is built into the tree.
+RESULTS_STRAINER = SoupStrainer('table')
+
+
+# Where the logged-in session's cookies are kept between runs; outside the
+# data directory, which is uploaded
+SESSION_COOKIE_FILE = os.environ.get(
+    'ATTENDANCE_COOKIE_FILE', os.path.join(tempfile.gettempdir(), 'nbkr_attendance_cookies.json')
+)
+
+# ChromeDriver path resolved by get_chromedriver_path
+_chromedriver_path = None
+
+# Most combinations sent to a process pool worker at once
+PROCESS_POOL_MAX_CHUNKSIZE = 8
+
+# Year-of-study folder names for each semester
+SEMESTER_YEAR_OF_STUDY = {
+    "First Yr - First Sem": "1-1",
+    "First Yr - Second Sem": "1-2",
+    "Second Yr - First Sem": "2-1",
+    "Second Yr - Second Sem": "2-2",
+    "Third Yr - First Sem": "3-1",
+    "Third Yr - Second Sem": "3-2",
+    "Final Yr - First Sem": "4-1",
+    "Final Yr - Second Sem": "4-2",
+    "Fourth Yr - First Sem": "4-1",  # Keep for backward compatibility
+    "Fourth Yr - Second Sem": "4-2"   # Keep for backward compatibility
+}
+
+# Threads writing student files in store_attendance_data; the writes are small
+# and mostly wait on the disk
+STORE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Folder for debug output (HTML dumps and screenshots) when --save-debug is set
+DEBUG_DIR = "debug_output"
+
+# Background writer for debug output, created per process on first use
+_debug_pool = None
+_debug_pool_pid = None
+_debug_pool_lock = threading.Lock()
+
+# Path of the attendance page, to recognise it after redirects
+ATTENDANCE_PORTAL_PATH = urlsplit(ATTENDANCE_PORTAL_URL).path
+
+# Reads the name, id and options of every select on the page in one WebDriver call
+FORM_SCHEMA_SCRIPT = """
+return Array.from(document.querySelectorAll('select')).map(s => ({
+    name: s.name || '',
+    id: s.id || '',
+    options: Array.from(s.options).map(o => ({text: o.text.trim(), value: o.value}))
+}));
+"""
+
+# Sets selects from [n, value] pairs in order, n being the select's position on the
+# page, firing their change handlers like a user would; returns the n not found
+SET_SELECTS_SCRIPT = """
+const selects = document.querySelectorAll('select');
+const missing = [];
+for (const [index, value] of arguments[0]) {
+    const select = selects[index];
+    if (!select) {
+        missing.push(index);
+        continue;
+    }
+    select.value = value;
+    select.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return missing;
+"""
+
+# Keywords identifying each filter's select in the browser: (name keywords, id keywords)
+SELENIUM_SELECT_KEYWORDS = {
+    'academic_year': (('year', 'academic'), ('year',)),
+    'semester': (('sem',), ('sem',)),
+    'branch': (('branch', 'dept'), ('branch',)),
+    'section': (('section',), ('section',)),
+}
+
+# Any input button whose value contains "show", case-insensitively
+SHOW_BUTTON_XPATH = "//input[@type='button'][contains(translate(@value, 'SHOW', 'show'), 'show')]"
+
+# Student rows or the empty-result message, whichever the results page shows
+RESULTS_XPATH = "//tr[@id] | //*[contains(text(), 'No Records Found')]"
+
+# A select element's options as (value, text, lowercased text) tuples
+SelectOptions = Tuple[Tuple[str, str, str], ...]
+
+# Scraper methods that pick the option value for each filter
+FILTER_VALUE_GETTERS = {
+    'academic_year': 'get_academic_year_value',
+    'semester': 'get_semester_value',
+    'branch': 'get_branch_value',
+    'section': 'get_section_value',
+}
+
+# Header words that mark a table as holding attendance data
+ATTENDANCE_TABLE_KEYWORDS = ('attendance', 'present', 'absent', 'total', 'percentage', '%', 'roll', 'name', 'student')
+
+# Header text of a roll number column
+ROLL_HEADER_RE = re.compile(r'roll|id|no|number|student id|student no|admission')
+
+# Characters replaced with underscores in data keys
+KEY_SEPARATORS = str.maketrans(' -', '__')
+
+
+@lru_cache(maxsize=8192)
+def clean_roll_number(roll_number: str) -> str:
+    """
+    Strip a date in parentheses from a roll number.
+
+    Results are cached, as the fallback approaches see the same rows again.
+
+    Args:
+        roll_number: Roll number text, possibly followed by "(date)"
+
+    Returns:
+        The part before the first "(" without spaces, or the input unchanged
+        unless it contains both "(" and ")"
+    """
+    if '(' in roll_number and ')' in roll_number:
+        return roll_number.split('(', 1)[0].strip().replace(' ', '')
+    return roll_number
+
+
+def select_filter_name(select_name: str) -> Optional[str]:
+    """
+    Work out which filter a form select element is for.
+
+    Args:
+        select_name: The select element's name attribute
+
+    Returns:
+        Filter name (a FILTER_VALUE_GETTERS key) or None
+    """
+    name = select_name.lower()
+    if 'year' in name or 'academic' in name:
+        return 'academic_year'
+    if 'sem' in name:
+        return 'semester'
+    if 'branch' in name:
+        return 'branch'
+    if 'section' in name:
+        return 'section'
+    return None
+
+
+def get_chromedriver_path() -> str:
+    """
+    Get the ChromeDriver to use, resolving it only once per process.
+
+    CHROMEDRIVER_PATH selects a driver shipped with the deployment; otherwise
+    webdriver_manager resolves (and if needed downloads) the matching driver,
+    which involves network requests.
+
+    Returns:
+        Path to the ChromeDriver executable
+    """
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        driver_path = os.environ.get('CHROMEDRIVER_PATH')
+        if not driver_path:
+            from webdriver_manager.chrome import ChromeDriverManager
+            driver_path = ChromeDriverManager().install()
+        _chromedriver_path = driver_path
+    return _chromedriver_path
+
+
+def is_attendance_page_url(url: str) -> bool:
+    """
+    Check whether a URL is the attendance portal page rather than, e.g., the
+    login page it redirects to when the session isn't authenticated.
+
+    Args:
+        url: Final URL of a response
+
+    Returns:
+        Boolean indicating whether the URL is the attendance page
+    """
+    return urlsplit(url).path == ATTENDANCE_PORTAL_PATH
+
+
+def select_options(select_element) -> SelectOptions:
+    """
+    Read a select element's options once, for repeated lookups.
+
+    Args:
+        select_element: BeautifulSoup select element
+
+    Returns:
+        Tuple of (value, text, lowercased text) per option, in page order.
+        It is hashable, so option lookups can be cached on it.
+    """
+    options = []
+    for option in select_element.find_all('option'):
+        option_text = option.text.strip()
+        options.append((option.get('value', ''), option_text, option_text.lower()))
+    return tuple(options)
+
+
+def _write_debug_file(path: str, data: Union[str, bytes]) -> None:
+    """Write one debug file; runs on the debug writer thread."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+        logger.debug(f"Saved debug output to {path}")
+    except OSError as e:
+        logger.warning(f"Could not save debug output to {path}: {e}")
+
+
+def save_debug_file(path: str, data: Union[str, bytes]) -> None:
+    """
+    Queue a debug file to be written in the background.
+
+    Debug output is only for inspection, so scraping doesn't wait for the disk.
+    Pending writes are flushed when the interpreter exits.
+
+    Args:
+        path: File to write
+        data: HTML text (encoded to UTF-8 on the writer thread) or raw bytes,
+            such as a response body or a PNG screenshot
+    """
+    global _debug_pool, _debug_pool_pid
+
+    with _debug_pool_lock:
+        # A forked worker process inherits the pool object but not its threads
+        if _debug_pool is None or _debug_pool_pid != os.getpid():
+            _debug_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='debug-writer')
+            _debug_pool_pid = os.getpid()
+            atexit.register(_debug_pool.shutdown, wait=True)
+        _debug_pool.submit(_write_debug_file, path, data)
+
+
+@lru_cache(maxsize=4096)
+def normalize_key(key: str) -> str:
+    """
+    Normalize a key string by converting to lowercase and replacing spaces with underscores.
+
+    The same subject and header names come up for every student, so results are
+    cached, and interned so every student's data dict shares one copy of each key.
+
+    Args:
+        key: The key string to normalize
+
+    Returns:
+        Normalized key string
+    """
+    return sys.intern(key.lower().translate(KEY_SEPARATORS))
+
+
+def scan_student_row(tr_tag) -> Tuple[Any, Any, List]:
+    """
+    Pick out a student row's roll number, percentage and subject cells in one pass.
+
+    Args:
+        tr_tag: Student row element
+
+    Returns:
+        Tuple of (first tdRollNo cell or None, first tdPercent cell or None,
+        cells with a title attribute in page order)
+    """
+    td_roll_no = td_percent = None
+    subject_cells = []
+    for td in tr_tag.find_all('td'):
+        classes = td.get('class') or ()
+        if td_roll_no is None and 'tdRollNo' in classes:
+            td_roll_no = td
+        if td_percent is None and 'tdPercent' in classes:
+            td_percent = td
+        if 'title' in td.attrs:
+            subject_cells.append(td)
+    return td_roll_no, td_percent, subject_cells
+
+
+def dump_json_bytes(data: Any) -> bytes:
+    """
+    Serialize data as JSON indented by two spaces, using orjson when available.
+
+    Args:
+        data: Data to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def parse_html(html: Union[str, bytes], parse_only=None) -> BeautifulSoup:
+    """
+    Parse an HTML document with the fastest available parser.
+
+    Args:
+        html: HTML content to parse, as text or raw bytes
+        parse_only: Optional SoupStrainer limiting which tags are built
+
+    Returns:
+        BeautifulSoup object
+    """
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+
 def retry_on_network_error(max_retries=3, initial_backoff=1):
     """
     Decorator to retry a function on network errors with exponential backoff.
@@ -113,12 +443,21 @@ class AttendanceScraper:
     A class to scrape attendance data from the college website.
     """
 
+    # One Chrome instance per process, shared by every scraper
+    _shared_driver = None
+    _shared_driver_failed = False
+    _shared_driver_lock = threading.Lock()
+
+    # Held while driving the shared browser, which can only do one thing at a time
+    browser_lock = threading.RLock()
+
     def __init__(self, username: str = USERNAME, password: str = PASSWORD,
                  base_dir: str = DEFAULT_SETTINGS['data_dir'],
                  headless: bool = DEFAULT_SETTINGS['headless'],
                  max_retries: int = DEFAULT_SETTINGS['max_retries'],
                  timeout: int = DEFAULT_SETTINGS['timeout'],
-                 save_debug: bool = False):
+                 save_debug: bool = False,
+                 enable_selenium: bool = True):
         """
         Initialize the scraper with login credentials and settings.
 
@@ -130,6 +469,8 @@ class AttendanceScraper:
             max_retries: Maximum number of retries for network errors (defaults to DEFAULT_SETTINGS['max_retries'])
             timeout: Timeout in seconds for waiting for elements (defaults to DEFAULT_SETTINGS['timeout'])
             save_debug: Whether to save debug files (HTML, screenshots, etc.)
+            enable_selenium: Whether the browser may be used at all; it is only
+                started when a Selenium code path first needs it
         """
         self.username = username
         self.password = password
@@ -138,15 +479,33 @@ class AttendanceScraper:
         self.headless = headless
         self.max_retries = max_retries
         self.timeout = timeout
-        self.driver = None
+        # FORCE_REQUESTS_SCRAPING keeps Chrome from ever being started (used on Railway to save memory)
+        self.enable_selenium = (enable_selenium and SELENIUM_AVAILABLE
+                                and os.environ.get('FORCE_REQUESTS_SCRAPING') != 'true')
+
+        # Whether self.session itself is logged in (a Selenium login only
+        # authenticates the browser); guarded by _auth_lock for worker threads
+        self.session_logged_in = False
+        self._auth_lock = threading.Lock()
+        # Whether the browser is logged in
+        self.driver_logged_in = False
+
+        # Attendance filter form structure, loaded on first use (for requests
+        # and for the browser respectively)
+        self._form_schema = None
+        self._selenium_form_schema = None
 
         # Store settings in a dictionary for easy access
         self.settings = {
             'save_debug': save_debug
         }
+        # Debug output folders already created
+        self._debug_folders = set()
+        # Student folders already created by store_attendance_data
+        self._student_folders = set()
 
         # Initialize session for requests-based scraping
-        self.session = create_session()
+        self.session = create_session(max_retries=self.max_retries)
 
         # Configure session based on headless mode
         if self.headless:
@@ -162,164 +521,219 @@ class AttendanceScraper:
         else:
             logger.info("Initialized attendance scraper in interactive mode")
 
-        # Initialize Selenium WebDriver if available
-        if SELENIUM_AVAILABLE:
+        # The browser is only started when a Selenium code path first needs it
+        self._driver = None
+        if not SELENIUM_AVAILABLE:
+            logger.warning("Selenium is not available. Using requests-based scraping only.")
+
+    @property
+    def driver(self):
+        """
+        Chrome WebDriver for the Selenium code paths, or None when Selenium is
+        disabled or unavailable.
+        """
+        if self._driver is None and self.enable_selenium:
+            self._driver = self.get_shared_driver(self.headless)
+        return self._driver
+
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+
+    @classmethod
+    def get_shared_driver(cls, headless: bool):
+        """
+        Get the process-wide Chrome WebDriver, starting it on first use.
+
+        Starting Chrome takes several seconds and a lot of memory, so every
+        scraper in the process shares one browser. Callers must hold
+        browser_lock while driving it.
+
+        Args:
+            headless: Whether to run Chrome in headless mode
+
+        Returns:
+            Chrome WebDriver or None if it could not be started
+        """
+        with cls._shared_driver_lock:
+            if cls._shared_driver is None and not cls._shared_driver_failed:
+                try:
+                    load_selenium()
+                    cls._shared_driver = cls._create_driver(headless)
+                except ImportError as e:
+                    logger.error(f"Could not import Selenium: {e}")
+                cls._shared_driver_failed = cls._shared_driver is None
+            return cls._shared_driver
+
+    @classmethod
+    def close_shared_driver(cls):
+        """
+        Quit the shared Chrome WebDriver if it was started.
+        """
+        with cls._shared_driver_lock:
+            driver, cls._shared_driver = cls._shared_driver, None
+            cls._shared_driver_failed = False
+        if driver:
             try:
-                options = Options()
+                driver.quit()
+                logger.debug("Browser closed successfully")
+            except Exception as e:
+                logger.error(f"Error closing browser: {str(e)}")
 
-                # Common options for both headless and non-headless mode
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
+    @staticmethod
+    def _create_driver(headless: bool):
+        """
+        Start a Chrome WebDriver configured for the current environment.
 
-                # Check if running on Render.com or Railway.app (environment detection)
-                is_render = os.environ.get('RENDER') == 'true'
-                is_railway = 'RAILWAY_ENVIRONMENT' in os.environ
-                is_docker = os.path.exists('/.dockerenv')
+        Args:
+            headless: Whether to run Chrome in headless mode
 
-                # Log the environment for debugging
+        Returns:
+            Chrome WebDriver or None if it could not be started
+        """
+        driver = None
+        try:
+            options = Options()
+
+            # Common options for both headless and non-headless mode
+            options.add_argument('--disable-gpu')
+            options.add_argument('--no-sandbox')
+            options.add_argument('--disable-dev-shm-usage')
+
+            # Check if running on Render.com or Railway.app (environment detection)
+            is_render = os.environ.get('RENDER') == 'true'
+            is_railway = 'RAILWAY_ENVIRONMENT' in os.environ
+            is_docker = os.path.exists('/.dockerenv')
+
+            # Log the environment for debugging
+            if is_render:
+                logger.info("Running on Render.com, using special Chrome configuration")
+            elif is_railway:
+                logger.info("Running on Railway.app, using special Chrome configuration")
+            elif is_docker:
+                logger.info("Running in Docker container, using special Chrome configuration")
+
+            # Common options for all environments
+            options.add_argument('--no-sandbox')
+            options.add_argument('--disable-dev-shm-usage')
+            options.add_argument('--disable-gpu')
+
+            # Configure for cloud/container environments
+            if is_render or is_railway or is_docker:
+                # Always use headless mode on cloud platforms
+                options.add_argument('--headless=new')
+
+                # Try different Chrome binary locations based on platform
                 if is_render:
-                    logger.info("Running on Render.com, using special Chrome configuration")
-                elif is_railway:
-                    logger.info("Running on Railway.app, using special Chrome configuration")
-                elif is_docker:
-                    logger.info("Running in Docker container, using special Chrome configuration")
-
-                # Common options for all environments
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--disable-gpu')
-
-                # Configure for cloud/container environments
-                if is_render or is_railway or is_docker:
-                    # Always use headless mode on cloud platforms
-                    options.add_argument('--headless=new')
-
-                    # Try different Chrome binary locations based on platform
-                    if is_render:
-                        # Render.com Chrome locations
-                        options.binary_location = "/usr/bin/google-chrome-stable"
-                    elif is_railway or is_docker:
-                        # Railway.app and Docker Chrome locations (Playwright image)
-                        chrome_paths = [
-                            "/usr/bin/google-chrome-stable",
-                            "/usr/bin/chromium",
-                            "/usr/bin/chromium-browser",
-                            "/ms-playwright/chromium-1095/chrome-linux/chrome"  # Playwright path
-                        ]
-
-                        # Try to find a valid Chrome binary
-                        for path in chrome_paths:
-                            if os.path.exists(path):
-                                options.binary_location = path
-                                logger.info(f"Found Chrome binary at: {path}")
-                                break
-
-                    # Additional options for cloud environments
-                    options.add_argument('--disable-setuid-sandbox')
-                    options.add_argument('--single-process')
-                elif self.headless:
-                    # Local headless mode
-                    options.add_argument('--headless=new')
-                else:
-                    # Local non-headless mode
-                    # Make sure the browser window is visible
-                    options.add_argument('--start-maximized')
-                    options.add_argument('--disable-extensions')
-                    options.add_argument('--disable-infobars')
-                    options.add_argument('--window-size=1920,1080')
-                    options.add_experimental_option('detach', True)  # Keep browser open
-                    options.add_experimental_option('excludeSwitches', ['enable-automation'])
-                    options.add_experimental_option('useAutomationExtension', False)
-
-                # Use the Service class to specify the chromedriver path if needed
-                # Uncomment and modify the line below if you need to specify a custom path
-                # service = Service('/path/to/chromedriver')
-
-                # Try different approaches to initialize the Chrome driver
-                try:
-                    # First try: Use webdriver_manager to get the correct driver
-                    try:
-                        from webdriver_manager.chrome import ChromeDriverManager
-                        from selenium.webdriver.chrome.service import Service as ChromeService
+                    # Render.com Chrome locations
+                    options.binary_location = "/usr/bin/google-chrome-stable"
+                elif is_railway or is_docker:
+                    # Railway.app and Docker Chrome locations (Playwright image)
+                    chrome_paths = [
+                        "/usr/bin/google-chrome-stable",
+                        "/usr/bin/chromium",
+                        "/usr/bin/chromium-browser",
+                        "/ms-playwright/chromium-1095/chrome-linux/chrome"  # Playwright path
+                    ]
+
+                    # Try to find a valid Chrome binary
+                    for path in chrome_paths:
+                        if os.path.exists(path):
+                            options.binary_location = path
+                            logger.info(f"Found Chrome binary at: {path}")
+                            break
 
-                        # Get the latest ChromeDriver
-                        driver_path = ChromeDriverManager().install()
-                        service = ChromeService(driver_path)
+                # Additional options for cloud environments
+                options.add_argument('--disable-setuid-sandbox')
+                options.add_argument('--single-process')
+            elif headless:
+                # Local headless mode
+                options.add_argument('--headless=new')
+            else:
+                # Local non-headless mode
+                # Make sure the browser window is visible
+                options.add_argument('--start-maximized')
+                options.add_argument('--disable-extensions')
+                options.add_argument('--disable-infobars')
+                options.add_argument('--window-size=1920,1080')
+                options.add_experimental_option('detach', True)  # Keep browser open
+                options.add_experimental_option('excludeSwitches', ['enable-automation'])
+                options.add_experimental_option('useAutomationExtension', False)
+
+            # Try different approaches to initialize the Chrome driver
+            try:
+                # First try: Use webdriver_manager to get the correct driver
+                try:
+                    from selenium.webdriver.chrome.service import Service as ChromeService
 
-                        # Set the service path explicitly to avoid using system ChromeDriver
-                        self.driver = webdriver.Chrome(service=service, options=options)
-                        logger.debug(f"Initialized Chrome WebDriver using webdriver_manager with path: {driver_path}")
-                    except Exception as e:
-                        logger.warning(f"Failed to initialize Chrome WebDriver using webdriver_manager: {e}")
+                    # Get the latest ChromeDriver
+                    driver_path = get_chromedriver_path()
+                    service = ChromeService(driver_path)
 
-                        # Second try: Use default Chrome driver without webdriver_manager
-                        try:
-                            logger.info("Trying to initialize Chrome WebDriver without webdriver_manager")
-                            self.driver = webdriver.Chrome(options=options)
-                            logger.debug("Initialized Chrome WebDriver using default Chrome driver")
-                        except Exception as e2:
-                            logger.error(f"Failed to initialize Chrome WebDriver using default approach: {e2}")
-
-                            # Third try: If on Render, Railway, or Docker, try with specific binary locations
-                            if is_render or is_railway or is_docker:
-                                # Try different Chrome binary locations
-                                chrome_locations = [
-                                    "/opt/render/chrome/chrome",                  # Render location
-                                    "/opt/google/chrome/chrome",                  # Another possible location
-                                    "/usr/bin/chromium",                          # Chromium as fallback
-                                    "/usr/bin/chromium-browser",                  # Another Chromium name
-                                    "/usr/bin/google-chrome-stable",              # Standard Linux Chrome
-                                    "/ms-playwright/chromium-1095/chrome-linux/chrome"  # Playwright path
-                                ]
-
-                                success = False
-                                for chrome_path in chrome_locations:
-                                    try:
-                                        if not os.path.exists(chrome_path):
-                                            logger.debug(f"Chrome binary not found at: {chrome_path}")
-                                            continue
-
-                                        logger.info(f"Trying Chrome at location: {chrome_path}")
-                                        options.binary_location = chrome_path
-                                        self.driver = webdriver.Chrome(options=options)
-                                        logger.info(f"Successfully initialized Chrome WebDriver using binary at {chrome_path}")
-                                        success = True
-                                        break
-                                    except Exception as e3:
-                                        logger.warning(f"Failed to initialize Chrome WebDriver with binary at {chrome_path}: {e3}")
-
-                                if not success:
-                                    logger.error("Failed to initialize Chrome WebDriver with any known binary location")
-                                    # Don't raise, just continue with requests-based approach
-                            else:
-                                raise
+                    # Set the service path explicitly to avoid using system ChromeDriver
+                    driver = webdriver.Chrome(service=service, options=options)
+                    logger.debug(f"Initialized Chrome WebDriver using webdriver_manager with path: {driver_path}")
                 except Exception as e:
-                    logger.error(f"All attempts to initialize Chrome WebDriver failed: {e}")
-                    # Don't raise here, just set driver to None and continue with requests-based approach
-                    self.driver = None
-
-                # Only set window size and implicit wait if driver was successfully initialized
-                if self.driver:
-                    self.driver.set_window_size(1366, 768)
-                    self.driver.implicitly_wait(10)  # Wait up to 10 seconds for elements to appear
-                    logger.info("Initialized Chrome WebDriver")
-                else:
-                    logger.warning("Chrome WebDriver initialization failed, falling back to requests-based scraping")
-            except Exception as e:
-                logger.error(f"Error initializing Chrome WebDriver: {e}")
-                self.driver = None
-        else:
-            logger.warning("Selenium is not available. Using requests-based scraping only.")
+                    logger.warning(f"Failed to initialize Chrome WebDriver using webdriver_manager: {e}")
 
-    def __del__(self):
-        """Clean up resources when the object is destroyed."""
-        if self.driver:
-            try:
-                self.driver.quit()
-                logger.debug("Chrome WebDriver closed")
+                    # Second try: Use default Chrome driver without webdriver_manager
+                    try:
+                        logger.info("Trying to initialize Chrome WebDriver without webdriver_manager")
+                        driver = webdriver.Chrome(options=options)
+                        logger.debug("Initialized Chrome WebDriver using default Chrome driver")
+                    except Exception as e2:
+                        logger.error(f"Failed to initialize Chrome WebDriver using default approach: {e2}")
+
+                        # Third try: If on Render, Railway, or Docker, try with specific binary locations
+                        if is_render or is_railway or is_docker:
+                            # Try different Chrome binary locations
+                            chrome_locations = [
+                                "/opt/render/chrome/chrome",                  # Render location
+                                "/opt/google/chrome/chrome",                  # Another possible location
+                                "/usr/bin/chromium",                          # Chromium as fallback
+                                "/usr/bin/chromium-browser",                  # Another Chromium name
+                                "/usr/bin/google-chrome-stable",              # Standard Linux Chrome
+                                "/ms-playwright/chromium-1095/chrome-linux/chrome"  # Playwright path
+                            ]
+
+                            success = False
+                            for chrome_path in chrome_locations:
+                                try:
+                                    if not os.path.exists(chrome_path):
+                                        logger.debug(f"Chrome binary not found at: {chrome_path}")
+                                        continue
+
+                                    logger.info(f"Trying Chrome at location: {chrome_path}")
+                                    options.binary_location = chrome_path
+                                    driver = webdriver.Chrome(options=options)
+                                    logger.info(f"Successfully initialized Chrome WebDriver using binary at {chrome_path}")
+                                    success = True
+                                    break
+                                except Exception as e3:
+                                    logger.warning(f"Failed to initialize Chrome WebDriver with binary at {chrome_path}: {e3}")
+
+                            if not success:
+                                logger.error("Failed to initialize Chrome WebDriver with any known binary location")
+                                # Don't raise, just continue with requests-based approach
+                        else:
+                            raise
             except Exception as e:
-                logger.error(f"Error closing Chrome WebDriver: {e}")
+                logger.error(f"All attempts to initialize Chrome WebDriver failed: {e}")
+                # Don't raise here, just set driver to None and continue with requests-based approach
+                driver = None
+
+            # Only set window size if driver was successfully initialized. No implicit
+            # wait: every wait is explicit, and an implicit wait would make each poll of
+            # an explicit wait (and every empty find_elements) block for its full duration
+            if driver:
+                driver.set_window_size(1366, 768)
+                logger.info("Initialized Chrome WebDriver")
+            else:
+                logger.warning("Chrome WebDriver initialization failed, falling back to requests-based scraping")
+        except Exception as e:
+            logger.error(f"Error initializing Chrome WebDriver: {e}")
+            driver = None
+        return driver
 
     @retry_on_network_error()
     def authenticate(self) -> bool:
@@ -332,7 +746,22 @@ class AttendanceScraper:
         if self.logged_in:
             return True
 
-        # Try to authenticate using Selenium if available
+        # Reuse the session saved by a previous run if it is still valid
+        if self.restore_saved_session():
+            return True
+
+        # Log in with a direct POST of the login form; it sets the same cookies
+        # as filling in the form in the browser, in one round-trip
+        logger.info("Authenticating using requests...")
+        success, error_msg = login(self.session, self.username, self.password)
+        if success:
+            self.logged_in = True
+            self.mark_session_authenticated()
+            return True
+
+        logger.warning(f"Requests-based authentication failed: {error_msg}")
+
+        # Fall back to logging in through the browser if available
         if self.driver:
             try:
                 logger.info("Authenticating using Selenium...")
@@ -360,12 +789,13 @@ class AttendanceScraper:
                 # Submit the form
                 password_field.submit()
 
-                # Wait for the page to load
-                time.sleep(2)
+                # Wait for the browser to leave the login form page
+                self._wait_until(EC.staleness_of(password_field), "the login form to submit")
 
                 # Check if login was successful
                 if "login" not in self.driver.current_url.lower():
                     self.logged_in = True
+                    self.driver_logged_in = True
                     logger.info("Login successful using Selenium")
                     return True
                 else:
@@ -374,19 +804,109 @@ class AttendanceScraper:
 
             except Exception as e:
                 logger.error(f"Error authenticating using Selenium: {e}")
-                # Fall back to requests-based authentication
 
-        # Use requests-based authentication as fallback
-        logger.info("Authenticating using requests...")
-        success, error_msg = login(self.session, self.username, self.password)
-        if success:
+        logger.error(f"Authentication failed: {error_msg}")
+        return False
+
+    def ensure_session_authenticated(self) -> bool:
+        """
+        Make sure the requests session is logged in, logging in at most once
+        even when called from several threads.
+
+        Returns:
+            Boolean indicating success
+        """
+        with self._auth_lock:
+            if self.session_logged_in:
+                return True
+
+            # Reuse the browser's login if there is one
+            if self.driver_logged_in:
+                self.sync_driver_cookies()
+                if is_logged_in(self.session, timeout=self.timeout):
+                    logger.info("Requests session authenticated with browser cookies")
+                    self.mark_session_authenticated()
+                    return True
+
+            logger.info("Authenticating requests session...")
+            success, error_msg = login(self.session, self.username, self.password)
+            if not success:
+                logger.error(f"Authentication failed: {error_msg}")
+                return False
+
+            self.mark_session_authenticated()
+            return True
+
+    def restore_saved_session(self) -> bool:
+        """
+        Reuse the session cookies saved by an earlier run, if they are still logged in.
+
+        Returns:
+            Boolean indicating whether the saved session is valid
+        """
+        with self._auth_lock:
+            if not load_session_cookies(self.session, SESSION_COOKIE_FILE, self.username):
+                return False
+
+            if not is_logged_in(self.session, timeout=self.timeout):
+                logger.info("Saved session has expired, logging in again")
+                return False
+
+            logger.info("Reusing the saved login session")
             self.logged_in = True
+            self.session_logged_in = True
             return True
-        else:
-            logger.error(f"Authentication failed: {error_msg}")
-            return False
 
-    @retry_on_network_error()
+    def mark_session_authenticated(self):
+        """
+        Record that the requests session is logged in and save its cookies for later runs.
+        """
+        self.session_logged_in = True
+        save_session_cookies(self.session, SESSION_COOKIE_FILE, self.username)
+
+    def share_session_cookies_with_driver(self):
+        """
+        Copy the requests session's cookies into the browser, so it is logged
+        in without going through the login form.
+        """
+        try:
+            with self.browser_lock:
+                # Cookies can only be added for the page the browser is on
+                self.driver.get(BASE_URL)
+                for cookie in self.session.cookies:
+                    self.driver.add_cookie({'name': cookie.name, 'value': cookie.value, 'path': cookie.path or '/'})
+            self.driver_logged_in = True
+        except Exception as e:
+            logger.warning(f"Could not copy session cookies to the browser: {e}")
+
+    def sync_driver_cookies(self):
+        """
+        Copy the browser's cookies into the requests session.
+        """
+        try:
+            with self.browser_lock:
+                cookies = self.driver.get_cookies()
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain'), path=cookie.get('path', '/')
+                )
+        except Exception as e:
+            logger.warning(f"Could not copy browser cookies to the requests session: {e}")
+
+    def configure_connection_pool(self, pool_size: int):
+        """
+        Size the session's connection pool for concurrent requests.
+
+        Args:
+            pool_size: Number of connections to keep per host
+        """
+        # Keep whatever retry policy the current adapter has
+        max_retries = self.session.get_adapter(BASE_URL).max_retries
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
     def navigate_to_attendance_page(self) -> Optional[BeautifulSoup]:
         """
         Navigate to the attendance page.
@@ -397,26 +917,28 @@ class AttendanceScraper:
         if not self.logged_in and not self.authenticate():
             return None
 
-        # Try to navigate using Selenium if available
-        if self.driver:
+        # Navigate using Selenium if the browser is logged in
+        if self.driver_logged_in:
             try:
                 # We should already be on the attendance page after authentication
                 # But let's navigate there explicitly to be sure
                 logger.info(f"Navigating to attendance page using Selenium: {ATTENDANCE_PORTAL_URL}")
                 self.driver.get(ATTENDANCE_PORTAL_URL)
 
-                # Wait for the page to load
-                time.sleep(2)
+                # Wait for the filter form, or for a redirect to the login page
+                self._wait_until(EC.any_of(
+                    EC.presence_of_element_located((By.TAG_NAME, 'select')),
+                    EC.url_contains('Login'),
+                ), "the attendance page to load")
 
                 # Log the current URL for debugging
                 logger.debug(f"Current URL after navigation: {self.driver.current_url}")
 
                 # Check if we're on the correct page
-                if "attendance" in self.driver.page_source.lower():
+                if is_attendance_page_url(self.driver.current_url):
                     logger.info("Successfully navigated to attendance page using Selenium")
                     # Parse the HTML content
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                    return soup
+                    return parse_html(self.driver.page_source, parse_only=FORM_STRAINER)
                 else:
                     logger.warning("Navigation to attendance page failed using Selenium - redirected to another page")
                     # Fall back to requests-based navigation
@@ -435,17 +957,15 @@ class AttendanceScraper:
             # Log the current URL for debugging
             logger.debug(f"Current URL after navigation: {response.url}")
 
-            # Parse the HTML content
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Check if we're on the correct page
-            if "attendance" in response.text.lower():
-                logger.info("Successfully navigated to attendance page using requests")
-                return soup
-            else:
+            # Check if we're on the correct page before parsing it; the URL is
+            # enough, the body doesn't need scanning
+            if not is_attendance_page_url(response.url):
                 logger.warning("Navigation to attendance page failed using requests - redirected to another page")
                 return None
 
+            logger.info("Successfully navigated to attendance page using requests")
+            return parse_html(response.text, parse_only=FORM_STRAINER)
+
         except requests.exceptions.RequestException as e:
             logger.error(f"Error navigating to attendance page using requests: {e}")
             return None
@@ -464,139 +984,128 @@ class AttendanceScraper:
         Returns:
             BeautifulSoup object of the results page or None if failed
         """
-        soup = self.navigate_to_attendance_page()
-        if not soup:
-            return None
+        # Submit the form directly first; one POST returns the same page the browser would
+        submitted, result_soup = self._select_form_filters_requests(academic_year, semester, branch, section)
+        if submitted or not (self.enable_selenium and self.driver):
+            return result_soup
 
-        # Try to use Selenium if available
-        if self.driver:
-            try:
-                logger.info(f"Using Selenium to select form filters: academic_year={academic_year}, semester={semester}, branch={branch}, section={section}")
+        # Last resort: drive the browser, one combination at a time
+        logger.info("Requests-based form submission failed, falling back to Selenium")
+        with self.browser_lock:
+            if not self.driver_logged_in:
+                self.share_session_cookies_with_driver()
+            if not self.navigate_to_attendance_page():
+                return None
+            return self._select_form_filters_selenium(academic_year, semester, branch, section)
 
-                # Wait for the form to load
-                time.sleep(2)
+    def get_debug_folder(self, academic_year: str, semester: str, branch: str, section: str) -> str:
+        """
+        Get the debug output folder for a combination, creating it the first time.
 
-                # Find all select elements
-                select_elements = self.driver.find_elements(By.TAG_NAME, 'select')
-                if not select_elements:
-                    logger.error("No select elements found in the form using Selenium")
-                    # Fall back to requests-based form submission
-                else:
-                    # Find and set academic year
-                    academic_year_set = False
-                    for select in select_elements:
-                        select_name = select.get_attribute('name') or ''
-                        select_id = select.get_attribute('id') or ''
-                        if 'year' in select_name.lower() or 'year' in select_id.lower() or 'academic' in select_name.lower():
-                            # Create a Select object
-                            from selenium.webdriver.support.ui import Select as SeleniumSelect
-                            select_obj = SeleniumSelect(select)
-
-                            # Try to find an option with text or value matching the academic year
-                            option_found = False
-                            for option in select.find_elements(By.TAG_NAME, 'option'):
-                                option_text = option.text.strip()
-                                if academic_year in option_text:
-                                    select_obj.select_by_visible_text(option_text)
-                                    academic_year_set = True
-                                    option_found = True
-                                    break
+        Args:
+            academic_year: Academic year
+            semester: Semester
+            branch: Branch
+            section: Section
 
-                            if not option_found:
-                                # If no match found, select the first option
-                                select_obj.select_by_index(0)
-                                academic_year_set = True
-                            break
+        Returns:
+            Path of the folder
+        """
+        # Convert semester to year_of_study format for folder structure
+        year_of_study = self.convert_semester_to_year_of_study(semester)
+        debug_folder = os.path.join(DEBUG_DIR, academic_year, year_of_study, branch, section)
 
-                    if not academic_year_set:
-                        logger.warning("Could not find academic year select element using Selenium")
-
-                    # Find and set semester
-                    semester_set = False
-                    for select in select_elements:
-                        select_name = select.get_attribute('name') or ''
-                        select_id = select.get_attribute('id') or ''
-                        if 'sem' in select_name.lower() or 'sem' in select_id.lower():
-                            # Create a Select object
-                            from selenium.webdriver.support.ui import Select as SeleniumSelect
-                            select_obj = SeleniumSelect(select)
-
-                            # Try to find an option with text matching the semester
-                            option_found = False
-                            for option in select.find_elements(By.TAG_NAME, 'option'):
-                                option_text = option.text.strip()
-                                if semester.lower() in option_text.lower():
-                                    select_obj.select_by_visible_text(option_text)
-                                    semester_set = True
-                                    option_found = True
-                                    break
+        # Only ask the filesystem the first time each folder is used
+        if debug_folder not in self._debug_folders:
+            os.makedirs(debug_folder, exist_ok=True)
+            self._debug_folders.add(debug_folder)
+        return debug_folder
 
-                            if not option_found:
-                                # If no match found, select the first option
-                                select_obj.select_by_index(0)
-                                semester_set = True
-                            break
+    def _wait_until(self, condition, description: str) -> bool:
+        """
+        Wait for a browser condition, up to the scraper's timeout.
 
-                    if not semester_set:
-                        logger.warning("Could not find semester select element using Selenium")
-
-                    # Find and set branch
-                    branch_set = False
-                    for select in select_elements:
-                        select_name = select.get_attribute('name') or ''
-                        select_id = select.get_attribute('id') or ''
-                        if 'branch' in select_name.lower() or 'branch' in select_id.lower() or 'dept' in select_name.lower():
-                            # Create a Select object
-                            from selenium.webdriver.support.ui import Select as SeleniumSelect
-                            select_obj = SeleniumSelect(select)
-
-                            # Try to find an option with text matching the branch
-                            option_found = False
-                            for option in select.find_elements(By.TAG_NAME, 'option'):
-                                option_text = option.text.strip()
-                                if branch.lower() in option_text.lower():
-                                    select_obj.select_by_visible_text(option_text)
-                                    branch_set = True
-                                    option_found = True
-                                    break
+        Args:
+            condition: Selenium expected condition (or any callable taking the driver)
+            description: What is being waited for, for the log
 
-                            if not option_found:
-                                # If no match found, select the first option
-                                select_obj.select_by_index(0)
-                                branch_set = True
-                            break
+        Returns:
+            True if the condition was met, False on timeout
+        """
+        try:
+            WebDriverWait(self.driver, self.timeout).until(condition)
+            return True
+        except TimeoutException:
+            logger.warning(f"Timed out after {self.timeout} seconds waiting for {description}")
+            return False
 
-                    if not branch_set:
-                        logger.warning("Could not find branch select element using Selenium")
-
-                    # Find and set section
-                    section_set = False
-                    for select in select_elements:
-                        select_name = select.get_attribute('name') or ''
-                        select_id = select.get_attribute('id') or ''
-                        if 'section' in select_name.lower() or 'section' in select_id.lower():
-                            # Create a Select object
-                            from selenium.webdriver.support.ui import Select as SeleniumSelect
-                            select_obj = SeleniumSelect(select)
-
-                            # Try to find an option with text matching the section
-                            option_found = False
-                            for option in select.find_elements(By.TAG_NAME, 'option'):
-                                option_text = option.text.strip()
-                                if section == option_text or section == option.get_attribute('value'):
-                                    select_obj.select_by_visible_text(option_text)
-                                    section_set = True
-                                    option_found = True
-                                    break
+    def _select_form_filters_selenium(self, academic_year: str, semester: str, branch: str, section: str) -> Optional[BeautifulSoup]:
+        """
+        Select form filters and submit the form in the browser.
 
-                            if not option_found:
-                                # If no match found, select the first option
-                                select_obj.select_by_index(0)
-                                section_set = True
-                            break
+        Args:
+            academic_year: Academic year to select (e.g., "2023-24")
+            semester: Semester to select (e.g., "First Yr - First Sem")
+            branch: Branch to select (e.g., "CSE")
+            section: Section to select (e.g., "A")
 
-                    if not section_set:
-                        logger.warning("Could not find section select element using Selenium")
+        Returns:
+            BeautifulSoup object of the results page or None if failed
+        """
+        if self.driver:
+            try:
+                logger.info(f"Using Selenium to select form filters: academic_year={academic_year}, semester={semester}, branch={branch}, section={section}")
+
+                # Wait for the form to load
+                self._wait_until(EC.presence_of_element_located((By.TAG_NAME, 'select')), "the filter form")
+
+                # Read all selects and their options in one call; the form is the
+                # same for every combination, so this is only done once
+                if not self._selenium_form_schema:
+                    self._selenium_form_schema = self.driver.execute_script(FORM_SCHEMA_SCRIPT)
+                form_schema = self._selenium_form_schema
+
+                if not form_schema:
+                    logger.error("No select elements found in the form using Selenium")
+                else:
+                    # Match each filter to the first select for it, in a single pass
+                    selects_by_filter = {}
+                    for index, select in enumerate(form_schema):
+                        select_name, select_id = select['name'].casefold(), select['id'].casefold()
+                        for filter_name, (name_keywords, id_keywords) in SELENIUM_SELECT_KEYWORDS.items():
+                            if filter_name not in selects_by_filter and (
+                                    any(keyword in select_name for keyword in name_keywords)
+                                    or any(keyword in select_id for keyword in id_keywords)):
+                                selects_by_filter[filter_name] = (index, select['options'])
+
+                    option_matchers = {
+                        'academic_year': lambda text, value: academic_year in text,
+                        'semester': lambda text, value: semester.lower() in text.lower(),
+                        'branch': lambda text, value: branch.lower() in text.lower(),
+                        'section': lambda text, value: section == text or section == value,
+                    }
+                    selections = []
+                    filters_by_index = {}
+                    for filter_name, matches in option_matchers.items():
+                        if filter_name not in selects_by_filter:
+                            logger.warning(f"Could not find {filter_name.replace('_', ' ')} select element using Selenium")
+                            continue
+
+                        # Select the matching option, or the first one if none match
+                        index, options = selects_by_filter[filter_name]
+                        value = next((option['value'] for option in options if matches(option['text'], option['value'])), None)
+                        if value is None and options:
+                            value = options[0]['value']
+                        selections.append([index, value])
+                        filters_by_index[index] = filter_name
+
+                    # Set every select in a single round-trip
+                    missing = self.driver.execute_script(SET_SELECTS_SCRIPT, selections) if selections else []
+                    for index in missing:
+                        logger.warning(f"Could not set {filters_by_index[index].replace('_', ' ')} select element using Selenium")
+                    if missing:
+                        # The page no longer matches the cached form
+                        self._selenium_form_schema = None
 
                     # Find and click the show button (using the approach from your old project)
                     try:
@@ -604,59 +1113,46 @@ class AttendanceScraper:
                         show_button = None
                         try:
                             # This is the most specific XPath that should find the Show button
-                            show_button = WebDriverWait(self.driver, 10).until(
+                            show_button = WebDriverWait(self.driver, self.timeout).until(
                                 EC.element_to_be_clickable((By.XPATH, "//input[@type='button'][@value='Show']"))
                             )
                             logger.info("Found Show button using XPath")
                         except Exception as e:
                             logger.debug(f"Could not find Show button using XPath: {e}")
 
-                        # Second try: Look for any button with 'show' in its value
+                        # Second try: Look for any button with 'show' in its value; XPath
+                        # filters in the browser instead of reading every input's attributes
                         if not show_button:
                             try:
-                                buttons = self.driver.find_elements(By.TAG_NAME, 'input')
-                                for button in buttons:
-                                    if button.get_attribute('type') == 'button' and button.get_attribute('value') and 'show' in button.get_attribute('value').lower():
-                                        show_button = button
-                                        logger.info(f"Found Show button with value: {button.get_attribute('value')}")
-                                        break
+                                buttons = self.driver.find_elements(By.XPATH, SHOW_BUTTON_XPATH)
+                                if buttons:
+                                    show_button = buttons[0]
+                                    logger.info(f"Found Show button with value: {show_button.get_attribute('value')}")
                             except Exception as e:
-                                logger.debug(f"Error searching for Show button by tag name: {e}")
+                                logger.debug(f"Error searching for Show button by value: {e}")
 
                         # Third try: Look for any input with type='submit'
                         if not show_button:
                             try:
-                                buttons = self.driver.find_elements(By.TAG_NAME, 'input')
-                                for button in buttons:
-                                    if button.get_attribute('type') == 'submit':
-                                        show_button = button
-                                        logger.info(f"Found submit button as fallback: {button.get_attribute('value')}")
-                                        break
+                                buttons = self.driver.find_elements(By.XPATH, "//input[@type='submit']")
+                                if buttons:
+                                    show_button = buttons[0]
+                                    logger.info(f"Found submit button as fallback: {show_button.get_attribute('value')}")
                             except Exception as e:
                                 logger.debug(f"Error searching for submit button: {e}")
 
                         # Take a screenshot for debugging in a structured folder (only if --save-debug is enabled)
                         if self.settings.get('save_debug', False):
-                            debug_dir = Path("debug_output")
-                            debug_dir.mkdir(parents=True, exist_ok=True)  # Create debug_output directory if it doesn't exist
-
-                            # Convert semester to year_of_study format for folder structure
-                            year_of_study = self.convert_semester_to_year_of_study(semester)
-
-                            # Create a structured folder path
-                            debug_folder = debug_dir / academic_year / year_of_study / branch / section
-                            debug_folder.mkdir(parents=True, exist_ok=True)
+                            debug_folder = self.get_debug_folder(academic_year, semester, branch, section)
 
                             # Save screenshot
-                            screenshot_path = debug_folder / "before_click.png"
-                            self.driver.save_screenshot(str(screenshot_path))
-                            logger.debug(f"Saved screenshot before clicking button to {screenshot_path}")
+                            screenshot_path = os.path.join(debug_folder, "before_click.png")
+                            save_debug_file(screenshot_path, self.driver.get_screenshot_as_png())
 
                         if show_button:
                             logger.info(f"Found button with value: {show_button.get_attribute('value')}")
                             # Scroll to the button to make sure it's visible
                             self.driver.execute_script("arguments[0].scrollIntoView(true);", show_button)
-                            time.sleep(1)  # Wait for scroll to complete
 
                             # Try JavaScript click first (more reliable)
                             try:
@@ -667,39 +1163,39 @@ class AttendanceScraper:
                                 show_button.click()
                                 logger.info("Clicked show button using regular click")
 
-                            # Wait for the results page to load
-                            time.sleep(5)  # Increased wait time
+                            # Wait for the results page to load: either the form page goes
+                            # away or the results appear in place
+                            if self._wait_until(EC.any_of(
+                                EC.staleness_of(show_button),
+                                EC.presence_of_element_located((By.XPATH, RESULTS_XPATH)),
+                            ), "the attendance results"):
+                                self._wait_until(
+                                    lambda driver: driver.execute_script("return document.readyState") == "complete",
+                                    "the results page to finish loading"
+                                )
+
+                            # Each page_source read is a WebDriver round-trip returning the whole page
+                            html = self.driver.page_source
 
                             # Save HTML content in debug mode in a structured folder (only if --save-debug is enabled)
                             if self.settings.get('save_debug', False):
-                                debug_dir = Path("debug_output")
-                                debug_dir.mkdir(parents=True, exist_ok=True)  # Create debug_output directory if it doesn't exist
-
-                                # Convert semester to year_of_study format for folder structure
-                                year_of_study = self.convert_semester_to_year_of_study(semester)
-
-                                # Create a structured folder path
-                                debug_folder = debug_dir / academic_year / year_of_study / branch / section
-                                debug_folder.mkdir(parents=True, exist_ok=True)
+                                debug_folder = self.get_debug_folder(academic_year, semester, branch, section)
 
                                 # Save HTML content
-                                html_path = debug_folder / "after_click.html"
-                                with open(html_path, 'w', encoding='utf-8') as f:
-                                    f.write(self.driver.page_source)
-                                logger.debug(f"Saved HTML content after clicking to {html_path}")
+                                html_path = os.path.join(debug_folder, "after_click.html")
+                                save_debug_file(html_path, html)
 
                                 # Also take a screenshot after clicking
-                                screenshot_path = debug_folder / "after_click.png"
-                                self.driver.save_screenshot(str(screenshot_path))
-                                logger.debug(f"Saved screenshot after clicking button to {screenshot_path}")
+                                screenshot_path = os.path.join(debug_folder, "after_click.png")
+                                save_debug_file(screenshot_path, self.driver.get_screenshot_as_png())
 
                             # Check if we got results
-                            if 'No Records Found' in self.driver.page_source:
+                            if 'No Records Found' in html:
                                 logger.warning(f"No records found for {academic_year}, {semester}, {branch}, {section} using Selenium")
                                 return None
 
                             # Parse the HTML content
-                            result_soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+                            result_soup = parse_html(html, parse_only=RESULTS_STRAINER)
 
                             # Check if we have student rows with IDs (a good indicator of success)
                             student_rows = result_soup.find_all('tr', attrs={'id': True})
@@ -708,239 +1204,325 @@ class AttendanceScraper:
                                 return result_soup
                             else:
                                 logger.warning("No student rows found in the result - form submission may have failed")
-                                # Continue with fallback
                         else:
                             logger.warning("Could not find show button using Selenium")
-                            # Fall back to requests-based form submission
                     except Exception as e:
                         logger.error(f"Error clicking show button: {e}")
-                        # Fall back to requests-based form submission
             except Exception as e:
                 logger.error(f"Error submitting form using Selenium: {e}")
-                # Fall back to requests-based form submission
 
-        # Use requests-based form submission as fallback
+        return None
+
+    def _select_form_filters_requests(self, academic_year: str, semester: str, branch: str,
+                                      section: str) -> Tuple[bool, Optional[BeautifulSoup]]:
+        """
+        Fetch the attendance form and submit it with the requests session.
+
+        Args:
+            academic_year: Academic year to select (e.g., "2023-24")
+            semester: Semester to select (e.g., "First Yr - First Sem")
+            branch: Branch to select (e.g., "CSE")
+            section: Section to select (e.g., "A")
+
+        Returns:
+            Tuple of (whether the form was submitted, results page or None). The
+            form counts as submitted when the portal answered "No Records Found".
+        """
+        if not self.ensure_session_authenticated():
+            return False, None
+
+        # The form is the same for every combination, so it is only fetched once
+        schema = self._form_schema
+        cached = schema is not None
+        if not cached:
+            schema = self._load_form_schema()
+            if not schema:
+                return False, None
+
+        submitted, result_soup = self._submit_filter_form(schema, academic_year, semester, branch, section)
+        if not submitted and cached:
+            # The cached form may be stale (expired session or changed page); reload it once
+            logger.info("Reloading the attendance form and retrying")
+            self._form_schema = None
+            return self._select_form_filters_requests(academic_year, semester, branch, section)
+
+        return submitted, result_soup
+
+    def _load_form_schema(self) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the attendance page and cache the structure of its filter form.
+
+        Returns:
+            Form schema (see _parse_form_schema) or None if failed
+        """
+        try:
+            response = self.session.get(ATTENDANCE_PORTAL_URL, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching attendance form: {e}")
+            return None
+
+        # Don't cache the login form when the session has expired
+        if not is_attendance_page_url(response.url):
+            logger.warning("Session expired, redirected to the login page")
+            self.session_logged_in = False
+            return None
+
+        schema = self._parse_form_schema(parse_html(response.text, parse_only=FORM_STRAINER))
+        self._form_schema = schema
+        return schema
+
+    def _parse_form_schema(self, soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+        """
+        Extract what is needed to submit the attendance filter form.
+
+        Args:
+            soup: BeautifulSoup object of the attendance page
+
+        Returns:
+            Dictionary with the form 'action' URL, the 'selects' as
+            (name, filter, options) tuples in page order, the fixed
+            'inputs' values; or None if the page has no form. Selects that don't match a filter
+            have filter None and their default value in place of the options.
+        """
+        form = soup.find('form')
+        if not form:
+            logger.error("Could not find form on attendance page")
+            return None
+
+        form_action = form.get('action', ATTENDANCE_PORTAL_URL)
+        if not form_action.startswith('http'):
+            form_action = f"{BASE_URL}/{form_action.lstrip('/')}"
+
+        # Find all select elements and map them to our filters
+        selects = []
+        for select in form.find_all('select'):
+            select_name = select.get('name')
+            if not select_name:
+                continue
+
+            filter_name = select_filter_name(select_name)
+            if filter_name:
+                selects.append((select_name, filter_name, select_options(select)))
+            else:
+                # For other fields, just use the first option value
+                options = select.find_all('option')
+                if options and options[0].get('value'):
+                    selects.append((select_name, None, options[0].get('value')))
+
+        # Find all input elements
+        inputs = {}
+        for input_elem in form.find_all('input'):
+            input_type = input_elem.get('type', '').lower()
+            input_name = input_elem.get('name')
+
+            if not input_name:
+                continue
+
+            if input_type == 'submit':
+                # Add the submit button value
+                inputs[input_name] = input_elem.get('value', 'Submit')
+            elif input_type in ['text', 'hidden', 'date']:
+                # Add other input values
+                inputs[input_name] = input_elem.get('value', '')
+
+        return {'action': form_action, 'selects': selects, 'inputs': inputs}
+
+    def submit_form_filters(self, academic_year: str, semester: str, branch: str, section: str) -> Optional[BeautifulSoup]:
+        """
+        Select form filters using requests only.
+
+        Unlike select_form_filters this never touches the browser, so it can be
+        called from several threads sharing this scraper's session.
+
+        Args:
+            academic_year: Academic year to select (e.g., "2023-24")
+            semester: Semester to select (e.g., "First Yr - First Sem")
+            branch: Branch to select (e.g., "CSE")
+            section: Section to select (e.g., "A")
+
+        Returns:
+            BeautifulSoup object of the results page or None if failed
+        """
+        return self._select_form_filters_requests(academic_year, semester, branch, section)[1]
+
+    def _submit_filter_form(self, schema: Dict[str, Any], academic_year: str, semester: str, branch: str,
+                            section: str) -> Tuple[bool, Optional[BeautifulSoup]]:
+        """
+        Fill in the attendance filter form and submit it with the requests session.
+
+        Args:
+            schema: Form schema from _parse_form_schema
+            academic_year: Academic year to select (e.g., "2023-24")
+            semester: Semester to select (e.g., "First Yr - First Sem")
+            branch: Branch to select (e.g., "CSE")
+            section: Section to select (e.g., "A")
+
+        Returns:
+            Tuple of (whether the form was submitted, results page or None)
+        """
         try:
-            # Get the form and its action URL
-            form = soup.find('form')
-            if not form:
-                logger.error("Could not find form on attendance page")
-                return None
+            filters = {
+                'academic_year': academic_year,
+                'semester': semester,
+                'branch': branch,
+                'section': section,
+            }
 
-            form_action = form.get('action', ATTENDANCE_PORTAL_URL)
-            if not form_action.startswith('http'):
-                form_action = f"{BASE_URL}/{form_action.lstrip('/')}"
+            # Debug messages below are only formatted when they will be logged
+            debug = logger.isEnabledFor(logging.DEBUG)
 
             # Extract the form fields and their values
             form_data = {}
-
-            # Find all select elements and their options
-            select_elements = form.find_all('select')
-            for select in select_elements:
-                select_name = select.get('name')
-                if not select_name:
+            for select_name, filter_name, options in schema['selects']:
+                if filter_name is None:
+                    form_data[select_name] = options
                     continue
 
-                # Map our parameters to the form field names
-                if 'year' in select_name.lower() or 'academic' in select_name.lower():
-                    # This is likely the academic year field
-                    form_data[select_name] = self.get_academic_year_value(select, academic_year)
-                    logger.debug(f"Selected academic year: {academic_year} -> {form_data[select_name]}")
-
-                elif 'sem' in select_name.lower():
-                    # This is likely the semester field
-                    form_data[select_name] = self.get_semester_value(select, semester)
-                    logger.debug(f"Selected semester: {semester} -> {form_data[select_name]}")
-
-                elif 'branch' in select_name.lower():
-                    # This is likely the branch field
-                    form_data[select_name] = self.get_branch_value(select, branch)
-                    logger.debug(f"Selected branch: {branch} -> {form_data[select_name]}")
-
-                elif 'section' in select_name.lower():
-                    # This is likely the section field
-                    form_data[select_name] = self.get_section_value(select, section)
-                    logger.debug(f"Selected section: {section} -> {form_data[select_name]}")
+                value = getattr(self, FILTER_VALUE_GETTERS[filter_name])(options, filters[filter_name])
+                form_data[select_name] = value
+                if debug:
+                    logger.debug(f"Selected {filter_name}: {filters[filter_name]} -> {value}")
 
-                else:
-                    # For other fields, just use the first option value
-                    options = select.find_all('option')
-                    if options and options[0].get('value'):
-                        form_data[select_name] = options[0].get('value')
-
-            # Find all input elements
-            input_elements = form.find_all('input')
-            for input_elem in input_elements:
-                input_type = input_elem.get('type', '').lower()
-                input_name = input_elem.get('name')
-
-                if not input_name:
-                    continue
-
-                if input_type == 'submit':
-                    # Add the submit button value
-                    form_data[input_name] = input_elem.get('value', 'Submit')
-                elif input_type in ['text', 'hidden', 'date']:
-                    # Add other input values
-                    form_data[input_name] = input_elem.get('value', '')
+            form_data.update(schema['inputs'])
 
             # Log the form data
             logger.info(f"Submitting form with filters: academic_year={academic_year}, semester={semester}, branch={branch}, section={section}")
-            logger.debug(f"Form data: {form_data}")
+            if debug:
+                logger.debug(f"Form data: {form_data}")
 
             # Submit the form
-            response = self.session.post(form_action, data=form_data, timeout=self.timeout)
+            response = self.session.post(schema['action'], data=form_data, timeout=self.timeout)
             response.raise_for_status()
 
-            # Parse the HTML content
-            result_soup = BeautifulSoup(response.text, 'html.parser')
+            if "login" in response.url.lower():
+                logger.warning("Session expired, redirected to the login page")
+                self.session_logged_in = False
+                return False, None
 
             # Save HTML content in debug mode
-            debug_dir = Path("debug_output")
-            if debug_dir.exists():
+            if self.settings.get('save_debug', False):
                 # Create a filename based on the parameters
                 filename = f"{academic_year}_{semester.replace(' ', '_')}_{branch}_{section}.html"
-                filepath = debug_dir / filename
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
-                logger.debug(f"Saved HTML content to {filepath}")
+                filepath = os.path.join(DEBUG_DIR, filename)
+                save_debug_file(filepath, response.content)
 
-            # Check if we got results
-            if 'No Records Found' in response.text:
+            # Check if we got results; searching the raw bytes avoids decoding
+            # pages that have nothing to parse
+            if b'No Records Found' in response.content:
                 logger.warning(f"No records found for {academic_year}, {semester}, {branch}, {section}")
-                return None
+                return True, None
 
-            return result_soup
+            # Parse the HTML content
+            return True, parse_html(response.text, parse_only=RESULTS_STRAINER)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error submitting form: {e}")
-            return None
+            return False, None
+
+    # The option lookups below only depend on their arguments, so they are
+    # cached across combinations and form reloads
 
-    def get_academic_year_value(self, select_element: BeautifulSoup, academic_year: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def get_academic_year_value(options: SelectOptions, academic_year: str) -> str:
         """
         Get the value for the academic year select element.
 
         Args:
-            select_element: The select element
+            options: The select element's options (see select_options)
             academic_year: The academic year to select
 
         Returns:
             The value to use in the form
         """
         # Try to find an option with text or value matching the academic year
-        for option in select_element.find_all('option'):
-            option_text = option.text.strip()
-            option_value = option.get('value', '')
-
+        for option_value, option_text, _ in options:
             if academic_year in option_text or academic_year in option_value:
                 return option_value
 
-        # If no match found, return the first option value
-        first_option = select_element.find('option')
-        if first_option:
-            return first_option.get('value', '')
-
-        # If all else fails, return the academic year itself
-        return academic_year
+        # If no match found, return the first option value; if all else fails,
+        # return the academic year itself
+        return options[0][0] if options else academic_year
 
-    def get_semester_value(self, select_element: BeautifulSoup, semester: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def get_semester_value(options: SelectOptions, semester: str) -> str:
         """
         Get the value for the semester select element.
 
         Args:
-            select_element: The select element
+            options: The select element's options (see select_options)
             semester: The semester to select
 
         Returns:
             The value to use in the form
         """
         # Try to find an option with text matching the semester
-        for option in select_element.find_all('option'):
-            option_text = option.text.strip()
-            option_value = option.get('value', '')
-
-            if semester.lower() in option_text.lower():
+        semester_lower = semester.lower()
+        for option_value, _, option_text_lower in options:
+            if semester_lower in option_text_lower:
                 return option_value
 
         # If no match found, try to match using the YEAR_SEM_CODES mapping
-        if semester in YEAR_SEM_CODES:
-            code = YEAR_SEM_CODES[semester]
-            for option in select_element.find_all('option'):
-                option_value = option.get('value', '')
-                if option_value == code:
-                    return option_value
-
-        # If no match found, return the first option value
-        first_option = select_element.find('option')
-        if first_option:
-            return first_option.get('value', '')
+        code = YEAR_SEM_CODES.get(semester)
+        if code is not None and any(option_value == code for option_value, _, _ in options):
+            return code
 
-        # If all else fails, return the semester itself
-        return semester
+        # If no match found, return the first option value; if all else fails,
+        # return the semester itself
+        return options[0][0] if options else semester
 
-    def get_branch_value(self, select_element: BeautifulSoup, branch: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def get_branch_value(options: SelectOptions, branch: str) -> str:
         """
         Get the value for the branch select element.
 
         Args:
-            select_element: The select element
+            options: The select element's options (see select_options)
             branch: The branch to select
 
         Returns:
             The value to use in the form
         """
         # Try to find an option with text matching the branch
-        for option in select_element.find_all('option'):
-            option_text = option.text.strip()
-            option_value = option.get('value', '')
-
-            if branch.lower() in option_text.lower():
+        branch_lower = branch.lower()
+        for option_value, _, option_text_lower in options:
+            if branch_lower in option_text_lower:
                 return option_value
 
         # If no match found, try to match using the BRANCH_CODES mapping
-        if branch in BRANCH_CODES:
-            code = BRANCH_CODES[branch]
-            for option in select_element.find_all('option'):
-                option_value = option.get('value', '')
-                if option_value == code:
-                    return option_value
-
-        # If no match found, return the first option value
-        first_option = select_element.find('option')
-        if first_option:
-            return first_option.get('value', '')
+        code = BRANCH_CODES.get(branch)
+        if code is not None and any(option_value == code for option_value, _, _ in options):
+            return code
 
-        # If all else fails, return the branch itself
-        return branch
+        # If no match found, return the first option value; if all else fails,
+        # return the branch itself
+        return options[0][0] if options else branch
 
-    def get_section_value(self, select_element: BeautifulSoup, section: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def get_section_value(options: SelectOptions, section: str) -> str:
         """
         Get the value for the section select element.
 
         Args:
-            select_element: The select element
+            options: The select element's options (see select_options)
             section: The section to select
 
         Returns:
             The value to use in the form
         """
         # Try to find an option with text or value matching the section
-        for option in select_element.find_all('option'):
-            option_text = option.text.strip()
-            option_value = option.get('value', '')
-
+        for option_value, option_text, _ in options:
             if section == option_text or section == option_value:
                 return option_value
 
-        # If no match found, return the first option value
-        first_option = select_element.find('option')
-        if first_option:
-            return first_option.get('value', '')
-
-        # If all else fails, return the section itself
-        return section
+        # If no match found, return the first option value; if all else fails,
+        # return the section itself
+        return options[0][0] if options else section
 
-    @retry_on_network_error()
     def extract_attendance_data(self, soup: BeautifulSoup, academic_year: str, semester: str, branch: str, section: str) -> List[Dict[str, Any]]:
         """
         Extract attendance data from the page.
@@ -958,100 +1540,22 @@ class AttendanceScraper:
         try:
             # Save the HTML content for debugging in a structured folder (only if --save-debug is enabled)
             if self.settings.get('save_debug', False):
-                debug_dir = Path("debug_output")
-                debug_dir.mkdir(parents=True, exist_ok=True)  # Create debug_output directory if it doesn't exist
-
-                # Convert semester to year_of_study format for folder structure
-                year_of_study = self.convert_semester_to_year_of_study(semester)
-
-                # Create a structured folder path
-                debug_folder = debug_dir / academic_year / year_of_study / branch / section
-                debug_folder.mkdir(parents=True, exist_ok=True)
+                debug_folder = self.get_debug_folder(academic_year, semester, branch, section)
 
                 # Create a filename
                 filename = f"attendance_debug.html"
-                filepath = debug_folder / filename
+                filepath = os.path.join(debug_folder, filename)
+                save_debug_file(filepath, str(soup))
 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(str(soup))
-                logger.debug(f"Saved HTML content to {filepath}")
+            # Walk the page's rows once; every approach below works from this list
+            all_rows = soup.find_all('tr')
 
             # Direct extraction using the pattern from the old project
-            attendance_data = []
-
             # Find all rows with IDs (these are student rows in the attendance table)
-            student_rows = soup.find_all('tr', attrs={'id': True})
+            student_rows = [row for row in all_rows if row.has_attr('id')]
             if student_rows:
                 logger.info(f"Found {len(student_rows)} student rows with IDs")
-
-                for tr_tag in student_rows:
-                    try:
-                        # Get the roll number from the row ID
-                        roll_number = tr_tag.get('id', '').strip()
-                        if not roll_number:
-                            continue
-
-                        # Extract just the roll number part if it has a date in parentheses
-                        if '(' in roll_number and ')' in roll_number:
-                            # Extract the part before the opening parenthesis
-                            roll_number = roll_number.split('(')[0].strip().replace(' ', '')
-
-                        # Create student data dictionary
-                        student_data = {
-                            'roll_number': roll_number,
-                            'data_type': 'attendance',
-                            'academic_year': academic_year,
-                            'semester': semester,
-                            'branch': branch,
-                            'section': section,
-                            'data': {}
-                        }
-
-                        # Extract roll number from tdRollNo class if available
-                        td_roll_no = tr_tag.find('td', {'class': 'tdRollNo'})
-                        if td_roll_no:
-                            # First try to get the roll number from the id attribute (removing 'td' prefix)
-                            id_attr = td_roll_no.get('id', '')
-                            if id_attr and id_attr.startswith('td'):
-                                roll_number = id_attr[2:]  # Remove 'td' prefix
-                                student_data['roll_number'] = roll_number
-                            # If no id attribute or it doesn't start with 'td', use the text content
-                            else:
-                                roll_number_text = td_roll_no.text.strip().replace(' ', '')
-                                if roll_number_text:
-                                    # Extract just the roll number part if it has a date in parentheses
-                                    if '(' in roll_number_text and ')' in roll_number_text:
-                                        roll_number_text = roll_number_text.split('(')[0].strip().replace(' ', '')
-                                    student_data['roll_number'] = roll_number_text
-
-                        # Extract attendance percentage from tdPercent class
-                        td_percent = tr_tag.find('td', {'class': 'tdPercent'})
-                        if td_percent:
-                            # The percentage is the first text content
-                            if td_percent.contents:
-                                student_data['data']['attendance_percentage'] = td_percent.contents[0].strip()
-
-                            # The total classes is in a font tag
-                            font_tag = td_percent.find('font')
-                            if font_tag:
-                                student_data['data']['total_classes'] = font_tag.text.strip()
-
-                        # Extract subject data from cells with title attributes
-                        subject_cells = [td for td in tr_tag.find_all('td') if 'title' in td.attrs]
-                        for cell in subject_cells:
-                            subject_name = cell.get('title', '').strip()
-                            if subject_name:
-                                value = cell.text.strip()
-                                if value:  # Only add non-empty values
-                                    student_data['data'][self.normalize_key(subject_name)] = value
-
-                        # Only add if we have actual data
-                        if student_data['data']:
-                            attendance_data.append(student_data)
-
-                    except Exception as e:
-                        logger.error(f"Error extracting data from student row: {e}")
-
+                attendance_data = self.extract_student_rows(student_rows, academic_year, semester, branch, section)
                 if attendance_data:
                     logger.info(f"Extracted attendance data for {len(attendance_data)} students using direct extraction")
                     return attendance_data
@@ -1059,7 +1563,7 @@ class AttendanceScraper:
             # Try different approaches to find student rows if direct extraction failed
 
             # Approach 1: Look for cells with class tdRollNo
-            roll_no_cells = soup.find_all('td', {'class': 'tdRollNo'})
+            roll_no_cells = [cell for row in all_rows for cell in row.find_all('td', {'class': 'tdRollNo'}, recursive=False)]
 
             if roll_no_cells:
                 logger.info(f"Found {len(roll_no_cells)} student rows using tdRollNo class")
@@ -1069,13 +1573,14 @@ class AttendanceScraper:
             tables = soup.find_all('table')
             if tables:
                 logger.info(f"Found {len(tables)} tables, trying to extract data from them")
-                result = self.extract_attendance_data_approach2(soup, tables, academic_year, semester, branch, section)
+                result = self.extract_attendance_data_approach2(soup, tables, academic_year, semester, branch, section,
+                                                                roll_no_cells=roll_no_cells)
                 if result:
                     return result
 
             # Approach 4: Try to extract data from saved HTML files if available (only if --save-debug is enabled)
             if self.settings.get('save_debug', False):
-                debug_dir = Path("debug_output")
+                debug_dir = Path(DEBUG_DIR)
                 if debug_dir.exists():
                     # Convert semester to year_of_study format for folder structure
                     year_of_study = self.convert_semester_to_year_of_study(semester)
@@ -1091,85 +1596,14 @@ class AttendanceScraper:
                             logger.info(f"Found {len(html_files)} saved HTML files in {debug_folder}, trying to extract data from them")
                             for html_file in html_files:
                                 try:
-                                    # Read the HTML file
-                                    with open(html_file, 'r', encoding='utf-8') as f:
-                                        html_content = f.read()
-                                    file_soup = BeautifulSoup(html_content, 'html.parser')
+                                    # Read the HTML file once, as bytes, and let the parser decode it
+                                    file_soup = parse_html(html_file.read_bytes(), parse_only=RESULTS_STRAINER)
 
                                     # Try direct extraction from the file
                                     student_rows = file_soup.find_all('tr', attrs={'id': True})
                                     if student_rows:
                                         logger.info(f"Found {len(student_rows)} student rows with IDs in saved file {html_file}")
-                                        # Extract data from student rows
-                                        attendance_data = []
-                                        for tr_tag in student_rows:
-                                            try:
-                                                # Get the roll number from the row ID
-                                                roll_number = tr_tag.get('id', '').strip()
-                                                if not roll_number:
-                                                    continue
-
-                                                # Extract just the roll number part if it has a date in parentheses
-                                                if '(' in roll_number and ')' in roll_number:
-                                                    # Extract the part before the opening parenthesis
-                                                    roll_number = roll_number.split('(')[0].strip().replace(' ', '')
-
-                                                # Create student data dictionary
-                                                student_data = {
-                                                    'roll_number': roll_number,
-                                                    'data_type': 'attendance',
-                                                    'academic_year': academic_year,
-                                                    'semester': semester,
-                                                    'branch': branch,
-                                                    'section': section,
-                                                    'data': {}
-                                                }
-
-                                                # Extract roll number from tdRollNo class if available
-                                                td_roll_no = tr_tag.find('td', {'class': 'tdRollNo'})
-                                                if td_roll_no:
-                                                    # First try to get the roll number from the id attribute (removing 'td' prefix)
-                                                    id_attr = td_roll_no.get('id', '')
-                                                    if id_attr and id_attr.startswith('td'):
-                                                        roll_number = id_attr[2:]  # Remove 'td' prefix
-                                                        student_data['roll_number'] = roll_number
-                                                    # If no id attribute or it doesn't start with 'td', use the text content
-                                                    else:
-                                                        roll_number_text = td_roll_no.text.strip().replace(' ', '')
-                                                        if roll_number_text:
-                                                            # Extract just the roll number part if it has a date in parentheses
-                                                            if '(' in roll_number_text and ')' in roll_number_text:
-                                                                roll_number_text = roll_number_text.split('(')[0].strip().replace(' ', '')
-                                                            student_data['roll_number'] = roll_number_text
-
-                                                # Extract attendance percentage from tdPercent class
-                                                td_percent = tr_tag.find('td', {'class': 'tdPercent'})
-                                                if td_percent:
-                                                    # The percentage is the first text content
-                                                    if td_percent.contents:
-                                                        student_data['data']['attendance_percentage'] = td_percent.contents[0].strip()
-
-                                                    # The total classes is in a font tag
-                                                    font_tag = td_percent.find('font')
-                                                    if font_tag:
-                                                        student_data['data']['total_classes'] = font_tag.text.strip()
-
-                                                # Extract subject data from cells with title attributes
-                                                subject_cells = [td for td in tr_tag.find_all('td') if 'title' in td.attrs]
-                                                for cell in subject_cells:
-                                                    subject_name = cell.get('title', '').strip()
-                                                    if subject_name:
-                                                        value = cell.text.strip()
-                                                        if value:  # Only add non-empty values
-                                                            student_data['data'][self.normalize_key(subject_name)] = value
-
-                                                # Only add if we have actual data
-                                                if student_data['data']:
-                                                    attendance_data.append(student_data)
-
-                                            except Exception as e:
-                                                logger.error(f"Error extracting data from student row in saved file: {e}")
-
+                                        attendance_data = self.extract_student_rows(student_rows, academic_year, semester, branch, section)
                                         if attendance_data:
                                             logger.info(f"Extracted attendance data for {len(attendance_data)} students from saved file {html_file}")
                                             return attendance_data
@@ -1185,7 +1619,6 @@ class AttendanceScraper:
                                     logger.error(f"Error extracting data from saved file {html_file}: {e}")
 
             # Approach 3: Look for any rows with roll numbers
-            all_rows = soup.find_all('tr')
             if all_rows:
                 logger.info(f"Found {len(all_rows)} rows, trying to extract data from them")
                 return self.extract_attendance_data_approach3(soup, all_rows, academic_year, semester, branch, section)
@@ -1197,6 +1630,122 @@ class AttendanceScraper:
             logger.error(f"Error extracting attendance data: {str(e)}")
             return []
 
+    def iter_student_rows(self, student_rows: Iterable, academic_year: str, semester: str, branch: str,
+                          section: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield attendance data from student rows (table rows with IDs) as each row is parsed.
+
+        Args:
+            student_rows: Student row elements
+            academic_year: Academic year
+            semester: Semester
+            branch: Branch (e.g., "CSE")
+            section: Section (e.g., "A")
+
+        Yields:
+            Dictionary of attendance data for each student row that has data
+        """
+        parse_student_row = self.parse_student_row
+        for tr_tag in student_rows:
+            try:
+                student_data = parse_student_row(tr_tag, academic_year, semester, branch, section)
+            except Exception as e:
+                logger.error(f"Error extracting data from student row: {e}")
+                continue
+
+            if student_data:
+                yield student_data
+
+    def extract_student_rows(self, student_rows: Iterable, academic_year: str, semester: str, branch: str,
+                             section: str) -> List[Dict[str, Any]]:
+        """
+        Extract attendance data from student rows (table rows with IDs).
+
+        Args:
+            student_rows: Student row elements
+            academic_year: Academic year
+            semester: Semester
+            branch: Branch (e.g., "CSE")
+            section: Section (e.g., "A")
+
+        Returns:
+            List of dictionaries containing attendance data
+        """
+        return list(self.iter_student_rows(student_rows, academic_year, semester, branch, section))
+
+    def parse_student_row(self, tr_tag, academic_year: str, semester: str, branch: str,
+                          section: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract one student's attendance data from their row.
+
+        Args:
+            tr_tag: Student row element
+            academic_year: Academic year
+            semester: Semester
+            branch: Branch (e.g., "CSE")
+            section: Section (e.g., "A")
+
+        Returns:
+            Dictionary of attendance data, or None if the row has no roll number or data
+        """
+        # Get the roll number from the row ID
+        roll_number = tr_tag.get('id', '').strip()
+        if not roll_number:
+            return None
+
+        # Extract just the roll number part if it has a date in parentheses
+        roll_number = clean_roll_number(roll_number)
+
+        td_roll_no, td_percent, subject_cells = scan_student_row(tr_tag)
+
+        # Extract roll number from tdRollNo class if available
+        if td_roll_no:
+            # First try to get the roll number from the id attribute (removing 'td' prefix)
+            id_attr = td_roll_no.get('id', '')
+            if id_attr and id_attr.startswith('td'):
+                roll_number = id_attr[2:]  # Remove 'td' prefix
+            # If no id attribute or it doesn't start with 'td', use the text content
+            else:
+                roll_number_text = td_roll_no.text.strip().replace(' ', '')
+                if roll_number_text:
+                    # Extract just the roll number part if it has a date in parentheses
+                    roll_number = clean_roll_number(roll_number_text)
+
+        data = {}
+
+        # Extract attendance percentage from tdPercent class
+        if td_percent:
+            # The percentage is the first text content
+            if td_percent.contents:
+                data['attendance_percentage'] = td_percent.contents[0].strip()
+
+            # The total classes is in a font tag
+            font_tag = td_percent.find('font')
+            if font_tag:
+                data['total_classes'] = font_tag.text.strip()
+
+        # Extract subject data from cells with title attributes
+        for cell in subject_cells:
+            subject_name = cell['title'].strip()
+            if subject_name:
+                value = cell.text.strip()
+                if value:  # Only add non-empty values
+                    data[normalize_key(subject_name)] = value
+
+        # Only add if we have actual data
+        if not data:
+            return None
+
+        return {
+            'roll_number': roll_number,
+            'data_type': 'attendance',
+            'academic_year': academic_year,
+            'semester': semester,
+            'branch': branch,
+            'section': section,
+            'data': data
+        }
+
     def extract_attendance_data_approach1(self, soup: BeautifulSoup, roll_no_cells: List,
                                          academic_year: str, semester: str, branch: str, section: str) -> List[Dict[str, Any]]:
         """
@@ -1227,12 +1776,10 @@ class AttendanceScraper:
                 # If no id attribute or it doesn't start with 'td', use the text content
                 roll_number = roll_cell.text.strip().replace(' ', '')
                 # Extract just the roll number part if it has a date in parentheses
-                if '(' in roll_number and ')' in roll_number:
-                    # Extract the part before the opening parenthesis
-                    roll_number = roll_number.split('(')[0].strip().replace(' ', '')
+                roll_number = clean_roll_number(roll_number)
 
-            # Find percentage cell
-            percent_cell = row.find('td', {'class': 'tdPercent'})
+            # Find percentage and subject cells
+            _, percent_cell, subject_cells = scan_student_row(row)
             attendance_percentage = "N/A"
             total_classes = "N/A"
 
@@ -1259,11 +1806,10 @@ class AttendanceScraper:
             }
 
             # Extract subject-wise attendance
-            subject_cells = row.find_all('td', {'title': True})
             for cell in subject_cells:
                 subject_name = cell.get('title')
                 attendance_value = cell.text.strip()
-                student_data['data'][self.normalize_key(subject_name)] = attendance_value
+                student_data['data'][normalize_key(subject_name)] = attendance_value
 
             attendance_data.append(student_data)
 
@@ -1271,7 +1817,8 @@ class AttendanceScraper:
         return attendance_data
 
     def extract_attendance_data_approach2(self, soup: BeautifulSoup, tables: List,
-                                         academic_year: str, semester: str, branch: str, section: str) -> List[Dict[str, Any]]:
+                                         academic_year: str, semester: str, branch: str, section: str,
+                                         roll_no_cells: Optional[List] = None) -> List[Dict[str, Any]]:
         """
         Extract attendance data using approach 2 (tables).
 
@@ -1282,26 +1829,30 @@ class AttendanceScraper:
             semester: Semester
             branch: Branch (e.g., "CSE")
             section: Section (e.g., "A")
+            roll_no_cells: Cells with class tdRollNo if the caller already looked
+                for them; searched for in the page if None
 
         Returns:
             List of dictionaries containing attendance data
         """
         attendance_data = []
 
-        # Debug: Print all tables found
-        logger.debug(f"Found {len(tables)} tables on the page")
-        for i, table in enumerate(tables):
-            rows = table.find_all('tr')
-            logger.debug(f"Table {i+1} has {len(rows)} rows")
-            if rows:
-                # Print the first row to see what it contains
-                first_row = rows[0]
-                cells = first_row.find_all(['th', 'td'])
-                cell_texts = [cell.text.strip() for cell in cells]
-                logger.debug(f"First row of Table {i+1}: {cell_texts}")
+        # Debug: Print all tables found (this walks every table, so only when it will be logged)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Found {len(tables)} tables on the page")
+            for i, table in enumerate(tables):
+                rows = table.find_all('tr')
+                logger.debug(f"Table {i+1} has {len(rows)} rows")
+                if rows:
+                    # Print the first row to see what it contains
+                    first_row = rows[0]
+                    cells = first_row.find_all(['th', 'td'])
+                    cell_texts = [cell.text.strip() for cell in cells]
+                    logger.debug(f"First row of Table {i+1}: {cell_texts}")
 
         # First approach: Look for rows with tdRollNo class (from old project)
-        roll_no_cells = soup.find_all('td', {'class': 'tdRollNo'})
+        if roll_no_cells is None:
+            roll_no_cells = soup.find_all('td', {'class': 'tdRollNo'})
         if roll_no_cells:
             logger.info(f"Found {len(roll_no_cells)} cells with tdRollNo class")
 
@@ -1322,9 +1873,7 @@ class AttendanceScraper:
                         if not roll_number:
                             continue
                         # Extract just the roll number part if it has a date in parentheses
-                        if '(' in roll_number and ')' in roll_number:
-                            # Extract the part before the opening parenthesis
-                            roll_number = roll_number.split('(')[0].strip().replace(' ', '')
+                        roll_number = clean_roll_number(roll_number)
 
                     # Create student data dictionary
                     student_data = {
@@ -1338,7 +1887,7 @@ class AttendanceScraper:
                     }
 
                     # Extract attendance percentage
-                    td_percent = tr_tag.find('td', {'class': 'tdPercent'})
+                    _, td_percent, subject_cells = scan_student_row(tr_tag)
                     if td_percent:
                         student_data['data']['attendance_percentage'] = td_percent.contents[0].strip()
                         font_tag = td_percent.find('font')
@@ -1346,12 +1895,11 @@ class AttendanceScraper:
                             student_data['data']['total_classes'] = font_tag.text.strip()
 
                     # Extract subject data
-                    subject_cells = [td for td in tr_tag.find_all('td') if 'title' in td.attrs]
                     for cell in subject_cells:
                         subject_name = cell.get('title', '').strip()
                         if subject_name:
                             value = cell.text.strip()
-                            student_data['data'][self.normalize_key(subject_name)] = value
+                            student_data['data'][normalize_key(subject_name)] = value
 
                     # Only add if we have actual data
                     if student_data['data']:
@@ -1365,10 +1913,12 @@ class AttendanceScraper:
                 return attendance_data
 
         # Second approach: Try to find a table with attendance data
+        # Each table's rows are collected once and reused by the checks below
+        table_rows = [table.find_all('tr') for table in tables]
+
         # Look for tables with specific keywords in headers
         attendance_table = None
-        for table in tables:
-            rows = table.find_all('tr')
+        for table, rows in zip(tables, table_rows):
             if not rows:
                 continue
 
@@ -1378,10 +1928,12 @@ class AttendanceScraper:
             cell_texts = [cell.text.strip().lower() for cell in cells]
 
             # Look for attendance-related keywords
-            attendance_keywords = ['attendance', 'present', 'absent', 'total', 'percentage', '%', 'roll', 'name', 'student']
-            if any(keyword in ' '.join(cell_texts) for keyword in attendance_keywords):
+            header_text = ' '.join(cell_texts)
+            if any(keyword in header_text for keyword in ATTENDANCE_TABLE_KEYWORDS):
                 attendance_table = table
-                logger.debug(f"Found potential attendance table with keywords: {[kw for kw in attendance_keywords if kw in ' '.join(cell_texts)]}")
+                attendance_rows = rows
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Found potential attendance table with keywords: {[kw for kw in ATTENDANCE_TABLE_KEYWORDS if kw in header_text]}")
                 break
 
         # If we didn't find a table with attendance keywords, use the largest table
@@ -1390,34 +1942,33 @@ class AttendanceScraper:
             main_table = None
             max_rows = 0
 
-            for table in tables:
-                rows = table.find_all('tr')
+            for table, rows in zip(tables, table_rows):
                 if len(rows) > max_rows:
                     max_rows = len(rows)
                     main_table = table
+                    attendance_rows = rows
 
             attendance_table = main_table
             logger.debug(f"Using largest table with {max_rows} rows as attendance table")
 
-        if not attendance_table or len(attendance_table.find_all('tr')) <= 1:  # Skip tables with only header row
+        if not attendance_table or len(attendance_rows) <= 1:  # Skip tables with only header row
             logger.warning("No suitable table found for attendance data")
             return []
 
         # Get all rows from the attendance table
-        rows = attendance_table.find_all('tr')
+        rows = attendance_rows
 
         # Extract header row to identify columns
         header_row = rows[0]
         headers = [th.text.strip() for th in header_row.find_all(['th', 'td'])]
-        logger.debug(f"Table headers: {headers}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Table headers: {headers}")
 
         # Find the roll number column index using various patterns
         roll_idx = -1
-        roll_patterns = ['roll', 'id', 'no', 'number', 'student id', 'student no', 'admission']
 
         for i, header in enumerate(headers):
-            header_lower = header.lower()
-            if any(pattern in header_lower for pattern in roll_patterns):
+            if ROLL_HEADER_RE.search(header.lower()):
                 roll_idx = i
                 logger.debug(f"Found roll number column at index {i}: '{header}'")
                 break
@@ -1453,9 +2004,7 @@ class AttendanceScraper:
                 continue  # Skip rows without roll number
 
             # Extract just the roll number part if it has a date in parentheses
-            if '(' in roll_number and ')' in roll_number:
-                # Extract the part before the opening parenthesis
-                roll_number = roll_number.split('(')[0].strip().replace(' ', '')
+            roll_number = clean_roll_number(roll_number)
 
             # Create student data dictionary
             student_data = {
@@ -1471,7 +2020,7 @@ class AttendanceScraper:
             # Extract other data
             for i, cell in enumerate(cells):
                 if i != roll_idx and i < len(headers):
-                    key = self.normalize_key(headers[i])
+                    key = normalize_key(headers[i])
                     value = cell.text.strip()
                     if value:  # Only add non-empty values
                         student_data['data'][key] = value
@@ -1479,7 +2028,7 @@ class AttendanceScraper:
                     # Also check for title attribute which might contain subject names
                     title = cell.get('title')
                     if title:
-                        title_key = self.normalize_key(title)
+                        title_key = normalize_key(title)
                         if title_key != key and value:  # Avoid duplicates and empty values
                             student_data['data'][title_key] = value
 
@@ -1514,18 +2063,16 @@ class AttendanceScraper:
             if len(cells) < 2:  # Need at least roll number and some data
                 continue
 
+            # Each cell's text is a walk over its descendants, so read it once
+            texts = [cell.text.strip() for cell in cells]
+
             # Try to find a cell that looks like a roll number
             roll_number = None
-            for cell in cells:
-                text = cell.text.strip()
+            for text in texts:
                 # Roll numbers are often numeric or have a specific format
                 if text and (text.isdigit() or (len(text) >= 5 and any(c.isdigit() for c in text))):
                     # Extract just the roll number part if it has a date in parentheses
-                    if '(' in text and ')' in text:
-                        # Extract the part before the opening parenthesis
-                        roll_number = text.split('(')[0].strip().replace(' ', '')
-                    else:
-                        roll_number = text.replace(' ', '')
+                    roll_number = clean_roll_number(text).replace(' ', '')
                     break
 
             if not roll_number:
@@ -1543,19 +2090,18 @@ class AttendanceScraper:
             }
 
             # Extract other data
-            for i, cell in enumerate(cells):
+            for i, (cell, value) in enumerate(zip(cells, texts)):
                 # Skip the cell we identified as roll number
-                if cell.text.strip() != roll_number:
+                if value != roll_number:
                     # Try to determine what this cell represents
                     key = f"column_{i}"
-                    value = cell.text.strip()
 
                     # Look for percentage indicators
                     if '%' in value:
                         key = 'attendance_percentage'
                     # Look for subject names in title attribute
                     elif cell.get('title'):
-                        key = self.normalize_key(cell.get('title'))
+                        key = normalize_key(cell.get('title'))
 
                     student_data['data'][key] = value
 
@@ -1566,7 +2112,7 @@ class AttendanceScraper:
 
     def normalize_key(self, key: str) -> str:
         """
-        Normalize a key string by converting to lowercase and replacing spaces with underscores.
+        Normalize a key string (see the module-level normalize_key).
 
         Args:
             key: The key string to normalize
@@ -1574,7 +2120,7 @@ class AttendanceScraper:
         Returns:
             Normalized key string
         """
-        return key.lower().replace(' ', '_').replace('-', '_')
+        return normalize_key(key)
 
     def convert_semester_to_year_of_study(self, semester: str) -> str:
         """
@@ -1586,20 +2132,7 @@ class AttendanceScraper:
         Returns:
             Year of study string (e.g., "1-1")
         """
-        semester_map = {
-            "First Yr - First Sem": "1-1",
-            "First Yr - Second Sem": "1-2",
-            "Second Yr - First Sem": "2-1",
-            "Second Yr - Second Sem": "2-2",
-            "Third Yr - First Sem": "3-1",
-            "Third Yr - Second Sem": "3-2",
-            "Final Yr - First Sem": "4-1",
-            "Final Yr - Second Sem": "4-2",
-            "Fourth Yr - First Sem": "4-1",  # Keep for backward compatibility
-            "Fourth Yr - Second Sem": "4-2"   # Keep for backward compatibility
-        }
-
-        return semester_map.get(semester, semester)
+        return SEMESTER_YEAR_OF_STUDY.get(semester, semester)
 
     def save_to_csv(self, data: List[Dict[str, Any]], filename: str = "attendance_data.csv",
                    academic_year: str = None, year_of_study: str = None) -> None:
@@ -1633,31 +2166,30 @@ class AttendanceScraper:
         csv_path = csv_folder / filename
 
         try:
-            if PANDAS_AVAILABLE:
-                # Use pandas if available
-                df = pd.DataFrame(data)
-                df.to_csv(csv_path, index=False)
-                logger.info(f"Saved {len(data)} attendance records to {csv_path}")
-            else:
-                # Fallback to using the csv module
-                import csv
-                with open(csv_path, 'w', newline='') as csvfile:
-                    # Get field names from the first dictionary
-                    fieldnames = data[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(data)
-                logger.info(f"Saved {len(data)} attendance records to {csv_path}")
+            import csv
+
+            # Columns in the order fields first appear; records missing a field
+            # leave it empty
+            fieldnames = list(dict.fromkeys(key for record in data for key in record))
+            with open(csv_path, 'w', newline='', encoding='utf-8', buffering=1024 * 1024) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                writer.writerows([record.get(key) for key in fieldnames] for record in data)
+            logger.info(f"Saved {len(data)} attendance records to {csv_path}")
         except Exception as e:
             logger.error(f"Error saving data to CSV: {e}")
 
 
-    def store_attendance_data(self, attendance_data: List[Dict[str, Any]], force_update: bool = False) -> Tuple[int, int]:
+    def store_attendance_data(self, attendance_data: Iterable[Dict[str, Any]], force_update: bool = False) -> Tuple[int, int]:
         """
         Store attendance data in a structured folder system.
 
+        Students are written concurrently, since each one is a few small file
+        writes that mostly wait on the disk.
+
         Args:
-            attendance_data: List of dictionaries containing attendance data
+            attendance_data: Dictionaries containing attendance data; any
+                iterable, such as iter_student_rows, is consumed once
             force_update: Whether to force update even if data already exists
 
         Returns:
@@ -1666,90 +2198,129 @@ class AttendanceScraper:
         success_count = 0
         update_count = 0
 
+        # Records for the same roll number share files, so they are stored in
+        # order by one task
+        records_by_roll = {}
+        for student in attendance_data:
+            records_by_roll.setdefault(student.get('roll_number'), []).append(student)
+
         # Check if we have valid data to store
-        if not attendance_data:
+        if not records_by_roll:
             logger.warning("No attendance data to store")
             return success_count, update_count
 
-        # Validate data structure before storing
-        for student in attendance_data:
-            # Check if student data has the required fields and non-empty data
-            if not all(k in student for k in ['roll_number', 'academic_year', 'semester', 'branch', 'section', 'data']):
-                logger.warning(f"Skipping invalid student data: {student}")
-                continue
+        def store_records(students):
+            return [self.store_student_attendance(student, force_update) for student in students]
 
-            # Check if data dictionary is not empty
-            if not student['data']:
-                logger.warning(f"Skipping student with empty data: {student['roll_number']}")
-                continue
+        with concurrent.futures.ThreadPoolExecutor(max_workers=STORE_WORKERS) as executor:
+            for results in executor.map(store_records, records_by_roll.values()):
+                for updated in results:
+                    if updated is None:
+                        continue
+                    success_count += 1
+                    if updated:
+                        update_count += 1
 
-            try:
-                # Extract student information
-                roll_number = student['roll_number']
-                academic_year = student['academic_year']
-                semester = student['semester']
-                branch = student['branch']
-                section = student['section']
-                data = student['data']
-
-                # Convert semester to year_of_study format
-                year_of_study = self.convert_semester_to_year_of_study(semester)
-
-                # Create folder structure (without branch and section folders)
-                student_folder = self.base_dir / academic_year / year_of_study / roll_number
-                student_folder.mkdir(parents=True, exist_ok=True)
+        return success_count, update_count
 
-                # Save attendance data
-                attendance_file = student_folder / "attendance.json"
+    def store_student_attendance(self, student: Dict[str, Any], force_update: bool = False) -> Optional[bool]:
+        """
+        Store one student's attendance data.
 
-                # Save branch and section information in roll_number.json file
-                self.store_student_info(student_folder, roll_number, branch, section)
+        Args:
+            student: Dictionary containing the student's attendance data
+            force_update: Whether to force update even if data already exists
 
-                # Check if file exists and compare data
-                should_update = True
-                if attendance_file.exists() and not force_update:
-                    try:
-                        with open(attendance_file, 'r') as f:
-                            existing_data = json.load(f)
+        Returns:
+            Whether the stored data was updated, or None if the student was
+            skipped or couldn't be stored
+        """
+        # Check if student data has the required fields and non-empty data
+        if not all(k in student for k in ['roll_number', 'academic_year', 'semester', 'branch', 'section', 'data']):
+            logger.warning(f"Skipping invalid student data: {student}")
+            return None
 
-                        # Simple comparison - if data is the same, don't update
-                        if existing_data == data:
-                            should_update = False
-                        else:
-                            # Log what changed
-                            changes = []
-                            for key in set(data.keys()) | set(existing_data.keys()):
-                                if key not in existing_data:
-                                    changes.append(f"Added {key}: {data[key]}")
-                                elif key not in data:
-                                    changes.append(f"Removed {key}")
-                                elif existing_data[key] != data[key]:
-                                    changes.append(f"Changed {key}: {existing_data[key]} -> {data[key]}")
-
-                            if changes:
-                                logger.debug(f"Changes for {roll_number}: {', '.join(changes[:3])}" +
-                                             (f" and {len(changes) - 3} more" if len(changes) > 3 else ""))
-                    except Exception as e:
-                        logger.warning(f"Error reading existing data for {roll_number}: {e}")
-                        should_update = True
+        # Check if data dictionary is not empty
+        if not student['data']:
+            logger.warning(f"Skipping student with empty data: {student['roll_number']}")
+            return None
 
-                if should_update:
-                    with open(attendance_file, 'w') as f:
-                        json.dump(data, f, indent=2)
+        try:
+            # Extract student information
+            roll_number = student['roll_number']
+            academic_year = student['academic_year']
+            semester = student['semester']
+            branch = student['branch']
+            section = student['section']
+            data = student['data']
+
+            # Convert semester to year_of_study format
+            year_of_study = SEMESTER_YEAR_OF_STUDY.get(semester, semester)
+
+            # Create folder structure (without branch and section folders)
+            student_folder = self.base_dir / academic_year / year_of_study / roll_number
+            # Only ask the filesystem the first time each folder is used
+            if student_folder not in self._student_folders:
+                student_folder.mkdir(parents=True, exist_ok=True)
+                self._student_folders.add(student_folder)
 
-                    # No need to update roll index as we now store this info in the student folder
+            # Save attendance data
+            attendance_file = student_folder / "attendance.json"
 
-                    logger.info(f"Updated attendance data for student {roll_number}")
-                    update_count += 1
-                else:
-                    logger.debug(f"No changes detected for student {roll_number}, skipping update")
+            # Save branch and section information in roll_number.json file
+            self.store_student_info(student_folder, roll_number, branch, section)
+
+            # Check if file exists and compare data
+            new_content = dump_json_bytes(data)
+            should_update = True
+            if attendance_file.exists() and not force_update:
+                try:
+                    existing_content = attendance_file.read_bytes()
+
+                    # Simple comparison - if the file already holds exactly this data,
+                    # don't update; it only needs parsing when something changed
+                    if existing_content == new_content:
+                        should_update = False
+                    elif logger.isEnabledFor(logging.DEBUG):
+                        existing_data = json.loads(existing_content)
+
+                        # Log what changed; only the first three changes are described
+                        changes = []
+                        change_count = 0
+                        for key in data.keys() | existing_data.keys():
+                            if key not in existing_data:
+                                change = f"Added {key}: {data[key]}" if change_count < 3 else None
+                            elif key not in data:
+                                change = f"Removed {key}" if change_count < 3 else None
+                            elif existing_data[key] != data[key]:
+                                change = f"Changed {key}: {existing_data[key]} -> {data[key]}" if change_count < 3 else None
+                            else:
+                                continue
+                            change_count += 1
+                            if change:
+                                changes.append(change)
+
+                        if changes:
+                            logger.debug(f"Changes for {roll_number}: {', '.join(changes)}" +
+                                         (f" and {change_count - 3} more" if change_count > 3 else ""))
+                except Exception as e:
+                    logger.warning(f"Error reading existing data for {roll_number}: {e}")
+                    should_update = True
 
-                success_count += 1
+            if should_update:
+                attendance_file.write_bytes(new_content)
 
-            except Exception as e:
-                logger.error(f"Error storing attendance data for student {student.get('roll_number', 'unknown')}: {str(e)}")
+                # No need to update roll index as we now store this info in the student folder
 
-        return success_count, update_count
+                logger.info(f"Updated attendance data for student {roll_number}")
+            else:
+                logger.debug(f"No changes detected for student {roll_number}, skipping update")
+
+            return should_update
+
+        except Exception as e:
+            logger.error(f"Error storing attendance data for student {student.get('roll_number', 'unknown')}: {str(e)}")
+            return None
 
     def store_student_info(self, student_folder: Path, roll_number: str, branch: str, section: str) -> bool:
         """
@@ -1787,157 +2358,222 @@ class AttendanceScraper:
         """
         Close the browser and clean up resources.
         """
-        if self.driver:
-            try:
-                self.driver.quit()
-                logger.debug("Browser closed successfully")
-            except Exception as e:
-                logger.error(f"Error closing browser: {str(e)}")
-            finally:
-                self.driver = None
-                self.logged_in = False
+        if self._driver:
+            self.close_shared_driver()
+            self._driver = None
+            self.logged_in = False
+            self.driver_logged_in = False
+
+# Don't leave Chrome running after the scraper exits
+atexit.register(AttendanceScraper.close_shared_driver)
 
-def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue: queue.Queue, args: argparse.Namespace):
+def fetch_combination(scraper: AttendanceScraper, combination: Tuple[str, str, str, str],
+                      delay: float) -> Optional[List[Dict[str, Any]]]:
     """
-    Worker function to process combinations from a queue.
+    Fetch and extract the attendance data for one combination using requests only.
 
     Args:
-        worker_id: ID of the worker
-        combination_queue: Queue of combinations to process
-        result_queue: Queue to store results
-        args: Command line arguments
+        scraper: Authenticated scraper whose session is shared between threads
+        combination: (academic_year, semester, branch, section)
+        delay: Delay in seconds before sending the request
+
+    Returns:
+        List of attendance records, or None if the results page couldn't be loaded
     """
-    # Initialize logging for this worker
-    worker_logger = logging.getLogger(f"worker-{worker_id}")
-    worker_logger.setLevel(getattr(logging, args.log_level))
+    if delay > 0:
+        time.sleep(delay)
 
-    # Initialize the scraper with command line credentials or defaults from config
-    username = args.username if args.username else USERNAME
-    password = args.password if args.password else PASSWORD
-    headless = args.headless if args.headless is not None else DEFAULT_SETTINGS['headless']
-    save_debug = args.save_debug
+    result_soup = scraper.submit_form_filters(*combination)
+    if not result_soup:
+        return None
 
-    # Create the scraper with all settings
-    scraper = AttendanceScraper(
-        username=username,
-        password=password,
-        base_dir=args.data_dir,
-        headless=headless,
-        max_retries=args.max_retries,
-        timeout=args.timeout,
-        save_debug=save_debug
-    )
+    return scraper.extract_attendance_data(result_soup, *combination)
 
-    # Authenticate
-    if not scraper.authenticate():
-        worker_logger.error(f"Worker {worker_id}: Authentication failed. Exiting.")
-        result_queue.put((worker_id, "auth_failed", None))
-        return
 
-    # Navigate to attendance page
-    soup = scraper.navigate_to_attendance_page()
-    if not soup:
-        worker_logger.error(f"Worker {worker_id}: Failed to navigate to attendance page. Exiting.")
-        result_queue.put((worker_id, "nav_failed", None))
-        return
+def store_results(scraper: AttendanceScraper, results: Iterable[Tuple[Tuple[str, str, str, str], Optional[List[Dict[str, Any]]]]],
+                  args: argparse.Namespace) -> Tuple[int, int, int]:
+    """
+    Store the attendance data of scraped combinations as it arrives.
+
+    Results are stored from the calling thread only, so two combinations
+    never write the same student files at once.
 
-    worker_logger.info(f"Worker {worker_id}: Ready to process combinations")
+    Args:
+        scraper: Scraper used to store the data
+        results: (combination, attendance records or None if the results page
+            couldn't be loaded) pairs, in completion order
+        args: Command line arguments
 
-    # Process combinations from the queue
+    Returns:
+        Tuple of (combinations tried, combinations with data, students found);
+        returns early once --skip-empty stops the scrape
+    """
+    total_combinations_tried = 0
+    total_combinations_with_data = 0
+    total_students_found = 0
     empty_combinations_in_a_row = 0
     max_empty_combinations = 10  # Stop after this many empty combinations in a row
-    combinations_processed = 0
-    combinations_with_data = 0
 
-    while True:
-        try:
-            # Get the next combination from the queue (non-blocking)
-            try:
-                combination_index, combination = combination_queue.get(block=False)
-                academic_year, semester, branch, section = combination
-            except queue.Empty:
-                # No more combinations to process
-                worker_logger.info(f"Worker {worker_id}: No more combinations to process. Exiting.")
+    for combination, attendance_data in results:
+        academic_year, semester, branch, section = combination
+        total_combinations_tried += 1
+
+        if attendance_data is None:
+            logger.warning(f"Failed to get results for {academic_year}, {semester}, {branch}, {section}")
+            continue
+
+        if not attendance_data:
+            logger.warning(f"No attendance data found for {academic_year}, {semester}, {branch}, {section}")
+            empty_combinations_in_a_row += 1
+
+            # If we've seen too many empty combinations in a row, stop
+            if empty_combinations_in_a_row >= max_empty_combinations and args.skip_empty:
+                logger.warning(f"Found {empty_combinations_in_a_row} empty combinations in a row. Stopping.")
                 break
+            continue
 
-            worker_logger.info(f"Worker {worker_id}: Processing combination {combination_index}: {academic_year}, {semester}, {branch}, {section}")
-            combinations_processed += 1
+        # Reset the counter since we found data
+        empty_combinations_in_a_row = 0
+        total_combinations_with_data += 1
 
-            # Add delay between requests if specified
-            if combinations_processed > 1 and args.delay > 0:
-                worker_logger.debug(f"Worker {worker_id}: Sleeping for {args.delay} seconds...")
-                time.sleep(args.delay)
+        # Store data in structured format
+        success_count, update_count = scraper.store_attendance_data(attendance_data, args.force_update)
+        logger.info(f"Processed {success_count} students with {update_count} updates")
 
-            # Select form filters and submit
-            result_soup = scraper.select_form_filters(academic_year, semester, branch, section)
-            if not result_soup:
-                worker_logger.warning(f"Worker {worker_id}: Failed to get results for {academic_year}, {semester}, {branch}, {section}")
-                result_queue.put((worker_id, "no_results", combination))
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
-                continue
+        # Also save to CSV if not disabled
+        if not args.no_csv:
+            year_of_study = scraper.convert_semester_to_year_of_study(semester)
+            output_file = f"{branch}_{section}_{args.output}"
+            scraper.save_to_csv(attendance_data, output_file, academic_year, year_of_study)
 
-            # Extract and save data
-            worker_logger.info(f"Worker {worker_id}: Successfully navigated to attendance results page")
-            attendance_data = scraper.extract_attendance_data(result_soup, academic_year, semester, branch, section)
+        total_students_found += len(attendance_data)
 
-            if not attendance_data:
-                worker_logger.warning(f"Worker {worker_id}: No attendance data found for {academic_year}, {semester}, {branch}, {section}")
-                empty_combinations_in_a_row += 1
-                result_queue.put((worker_id, "no_data", combination))
+    return total_combinations_tried, total_combinations_with_data, total_students_found
 
-                # If we've seen too many empty combinations in a row, stop
-                if empty_combinations_in_a_row >= max_empty_combinations and args.skip_empty:
-                    worker_logger.warning(f"Worker {worker_id}: Found {empty_combinations_in_a_row} empty combinations in a row. Stopping.")
-                    break
 
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
-                continue
+def scrape_with_thread_pool(scraper: AttendanceScraper, combinations: List[Tuple[str, str, str, str]],
+                            args: argparse.Namespace, num_workers: int) -> Tuple[int, int, int]:
+    """
+    Scrape combinations concurrently with a thread pool sharing one requests session.
 
-            # Reset the counter since we found data
-            empty_combinations_in_a_row = 0
-            combinations_with_data += 1
+    Network requests and parsing run in the pool; results are stored from the
+    calling thread.
 
-            # Store data in structured format
-            success_count, update_count = scraper.store_attendance_data(attendance_data, args.force_update)
-            worker_logger.info(f"Worker {worker_id}: Processed {success_count} students with {update_count} updates")
+    Args:
+        scraper: Authenticated scraper
+        combinations: Combinations to scrape
+        args: Command line arguments
+        num_workers: Number of worker threads
 
-            # Also save to CSV if not disabled
-            if not args.no_csv:
-                # Convert semester to year_of_study format for folder structure
-                year_of_study = scraper.convert_semester_to_year_of_study(semester)
+    Returns:
+        Tuple of (combinations tried, combinations with data, students found)
+    """
+    scraper.configure_connection_pool(num_workers)
+    if not scraper.ensure_session_authenticated():
+        logger.error("Authentication failed. Exiting.")
+        sys.exit(1)
 
-                # Create a filename for the CSV
-                csv_filename = f"{branch}_{section}_attendance_data.csv"
+    def completed(futures):
+        for future in concurrent.futures.as_completed(futures):
+            combination = futures[future]
+            try:
+                yield combination, future.result()
+            except Exception as e:
+                logger.error(f"Error processing combination {combination}: {str(e)}")
+                yield combination, None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = {
+            executor.submit(fetch_combination, scraper, combination, args.delay if i > 0 else 0): combination
+            for i, combination in enumerate(combinations)
+        }
+        totals = store_results(scraper, completed(futures), args)
 
-                # Save to CSV
-                scraper.save_to_csv(attendance_data, csv_filename, academic_year, year_of_study)
+        # Drop whatever is still queued if the scrape stopped early
+        for future in futures:
+            future.cancel()
 
-            # Put the result in the result queue
-            result_queue.put((worker_id, "success", (combination, len(attendance_data))))
-            # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-            if hasattr(combination_queue, 'task_done'):
-                combination_queue.task_done()
+    return totals
 
-        except Exception as e:
-            worker_logger.error(f"Worker {worker_id}: Error processing combination: {str(e)}")
-            result_queue.put((worker_id, "error", (combination if 'combination' in locals() else None, str(e))))
-            if 'combination' in locals():
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
-
-    # Clean up
+
+# Scraper of the current pool worker process, created by init_scrape_worker
+_worker_scraper = None
+
+
+def init_scrape_worker(scraper_kwargs: Dict[str, Any], cookies: List[Tuple[str, str, str, str]]):
+    """
+    Create the scraper for a worker process of scrape_with_process_pool.
+
+    Args:
+        scraper_kwargs: AttendanceScraper keyword arguments
+        cookies: (name, value, domain, path) of the parent's logged-in session
+            cookies, or an empty list if it isn't logged in
+    """
+    global _worker_scraper
+    # Workers only use the requests path, so they never start a browser
+    _worker_scraper = AttendanceScraper(enable_selenium=False, **scraper_kwargs)
+
+    # Start from the parent's login instead of logging in again; if it expires,
+    # the login redirect is detected and the worker logs in by itself
+    if cookies:
+        for name, value, domain, path in cookies:
+            _worker_scraper.session.cookies.set(name, value, domain=domain, path=path)
+        _worker_scraper.logged_in = True
+        _worker_scraper.session_logged_in = True
+
+
+def scrape_combination_in_worker(task: Tuple[Tuple[str, str, str, str], float]) -> Tuple[Tuple[str, str, str, str], Optional[List[Dict[str, Any]]]]:
+    """
+    Fetch and extract one combination in a pool worker process.
+
+    Args:
+        task: (combination, delay) as passed to fetch_combination
+
+    Returns:
+        Tuple of (combination, attendance records or None if failed)
+    """
+    combination, delay = task
     try:
-        scraper.close()
+        return combination, fetch_combination(_worker_scraper, combination, delay)
     except Exception as e:
-        worker_logger.error(f"Worker {worker_id}: Error closing scraper: {str(e)}")
+        logger.error(f"Error processing combination {combination}: {str(e)}")
+        return combination, None
+
+
+def scrape_with_process_pool(scraper: AttendanceScraper, combinations: List[Tuple[str, str, str, str]],
+                             args: argparse.Namespace, num_workers: int,
+                             scraper_kwargs: Dict[str, Any]) -> Tuple[int, int, int]:
+    """
+    Scrape combinations with a pool of worker processes, each with its own session.
+
+    Parsing runs in the workers, outside this process's GIL; results are
+    stored from the calling process as they complete.
+
+    Args:
+        scraper: Scraper used to store the data
+        combinations: Combinations to scrape
+        args: Command line arguments
+        num_workers: Number of worker processes
+        scraper_kwargs: AttendanceScraper keyword arguments for the workers
+
+    Returns:
+        Tuple of (combinations tried, combinations with data, students found)
+    """
+    tasks = [(combination, args.delay) for combination in combinations]
 
-    worker_logger.info(f"Worker {worker_id}: Finished processing {combinations_processed} combinations with {combinations_with_data} containing data")
-    result_queue.put((worker_id, "finished", (combinations_processed, combinations_with_data)))
+    # Hand the workers this process's login, so they don't each log in again
+    cookies = []
+    if scraper.session_logged_in:
+        cookies = [(cookie.name, cookie.value, cookie.domain, cookie.path) for cookie in scraper.session.cookies]
+
+    # Hand out tasks in small batches to cut per-task pipe traffic, while keeping
+    # batches short enough that results still stream back for --skip-empty
+    chunksize = max(1, min(PROCESS_POOL_MAX_CHUNKSIZE, len(tasks) // (num_workers * 4)))
+
+    # Leaving the with block terminates any workers still running after an early stop
+    with multiprocessing.Pool(processes=num_workers, initializer=init_scrape_worker,
+                              initargs=(scraper_kwargs, cookies)) as pool:
+        return store_results(scraper, pool.imap_unordered(scrape_combination_in_worker, tasks, chunksize=chunksize), args)
 
 
 def main():
@@ -1949,7 +2585,7 @@ def main():
     parser.add_argument('--no-csv', action='store_true', help='Disable CSV file generation')
     parser.add_argument('--academic-year', choices=DEFAULT_ACADEMIC_YEARS, help='Academic year')
     parser.add_argument('--semester', choices=DEFAULT_SEMESTERS, help='Semester')
-    parser.add_argument('--branch', choices=list(BRANCH_CODES.keys()), help='Branch')
+    parser.add_argument('--branch', choices=BRANCH_KEYS, help='Branch')
     parser.add_argument('--section', choices=DEFAULT_SECTIONS, help='Section')
     parser.add_argument('--data-dir', default=DEFAULT_SETTINGS['data_dir'], help='Directory to store student data')
     parser.add_argument('--force-update', action='store_true', help='Force update even if data already exists')
@@ -1967,13 +2603,13 @@ def main():
     parser.add_argument('--reverse', action='store_true', help='Reverse the order of combinations (oldest first)')
     parser.add_argument('--only-years', nargs='+', choices=DEFAULT_ACADEMIC_YEARS, help='Only scrape specific academic years')
     parser.add_argument('--only-semesters', nargs='+', choices=DEFAULT_SEMESTERS, help='Only scrape specific semesters')
-    parser.add_argument('--only-branches', nargs='+', choices=list(BRANCH_CODES.keys()), help='Only scrape specific branches')
+    parser.add_argument('--only-branches', nargs='+', choices=BRANCH_KEYS, help='Only scrape specific branches')
     parser.add_argument('--only-sections', nargs='+', choices=DEFAULT_SECTIONS, help='Only scrape specific sections')
 
     # Multi-worker options
     parser.add_argument('--workers', type=int, default=1, help='Number of worker processes/threads for parallel scraping')
     parser.add_argument('--worker-mode', choices=['process', 'thread'], default='process',
-                        help='Worker mode: process (separate processes) or thread (separate threads)')
+                        help='Worker mode: process (separate processes) or thread (threads sharing one requests session)')
 
     args = parser.parse_args()
 
@@ -1988,7 +2624,7 @@ def main():
 
     # Create debug directory if needed and save_debug is enabled
     if save_debug:
-        debug_dir = Path("debug_output")
+        debug_dir = Path(DEBUG_DIR)
         debug_dir.mkdir(exist_ok=True)
         logger.info(f"Debug file saving enabled. Debug files will be saved to {debug_dir}")
 
@@ -1998,15 +2634,16 @@ def main():
     headless = args.headless if args.headless is not None else DEFAULT_SETTINGS['headless']
 
     # Create the scraper with all settings
-    scraper = AttendanceScraper(
-        username=username,
-        password=password,
-        base_dir=args.data_dir,
-        headless=headless,
-        max_retries=args.max_retries,
-        timeout=args.timeout,
-        save_debug=save_debug
-    )
+    scraper_kwargs = {
+        'username': username,
+        'password': password,
+        'base_dir': args.data_dir,
+        'headless': headless,
+        'max_retries': args.max_retries,
+        'timeout': args.timeout,
+        'save_debug': save_debug,
+    }
+    scraper = AttendanceScraper(**scraper_kwargs)
 
     # Authenticate
     if not scraper.authenticate():
@@ -2058,23 +2695,19 @@ def main():
         else:
             sections = DEFAULT_SECTIONS
 
-        # Create all combinations
-        combinations = [
-            (year, sem, branch, section)
-            for year in academic_years
-            for sem in semesters
-            for branch in branches
-            for section in sections
-        ]
-
-        # Reverse the order if requested (oldest first)
+        # Reverse the order if requested (oldest first); reversing every filter
+        # reverses the order of their product
+        filters = [academic_years, semesters, branches, sections]
         if args.reverse:
-            combinations.reverse()
+            filters = [list(reversed(values)) for values in filters]
 
-        # Limit the number of combinations if requested
-        if args.max_combinations > 0 and len(combinations) > args.max_combinations:
-            logger.info(f"Limiting to {args.max_combinations} combinations out of {len(combinations)}")
-            combinations = combinations[:args.max_combinations]
+        # Create all combinations, stopping at the limit if one was requested
+        combinations = itertools.product(*filters)
+        total_combinations = len(academic_years) * len(semesters) * len(branches) * len(sections)
+        if args.max_combinations > 0 and total_combinations > args.max_combinations:
+            logger.info(f"Limiting to {args.max_combinations} combinations out of {total_combinations}")
+            combinations = itertools.islice(combinations, args.max_combinations)
+        combinations = list(combinations)
 
         logger.info(f"Generated {len(combinations)} combinations to try")
 
@@ -2082,75 +2715,15 @@ def main():
     num_workers = args.workers
     worker_mode = args.worker_mode
 
-    if num_workers > 1:
-        logger.info(f"Using {num_workers} workers in {worker_mode} mode")
-
-        # Create queues for combinations and results
-        if worker_mode == 'thread':
-            # Use thread-safe queues
-            combination_queue = queue.Queue()
-            result_queue = queue.Queue()
-        else:
-            # Use process-safe queues
-            combination_queue = multiprocessing.Queue()
-            result_queue = multiprocessing.Queue()
-
-        # Add combinations to the queue
-        for i, combination in enumerate(combinations):
-            combination_queue.put((i+1, combination))
-
-        logger.info(f"Added {len(combinations)} combinations to the queue")
-
-        # Create and start workers
-        workers = []
-        if worker_mode == 'thread':
-            # Use threads
-            for i in range(num_workers):
-                worker = threading.Thread(
-                    target=worker_function,
-                    args=(i+1, combination_queue, result_queue, args)
-                )
-                workers.append(worker)
-                worker.start()
-                logger.info(f"Started worker thread {i+1}")
-        else:
-            # Use processes
-            for i in range(num_workers):
-                worker = multiprocessing.Process(
-                    target=worker_function,
-                    args=(i+1, combination_queue, result_queue, args)
-                )
-                workers.append(worker)
-                worker.start()
-                logger.info(f"Started worker process {i+1}")
-
-        # Wait for all workers to finish
-        for worker in workers:
-            worker.join()
-
-        logger.info("All workers have finished")
-
-        # Process results
-        total_combinations_tried = 0
-        total_combinations_with_data = 0
-        total_students_found = 0
+    if num_workers > 1 and worker_mode == 'thread':
+        logger.info(f"Using {num_workers} worker threads sharing one session")
+        total_combinations_tried, total_combinations_with_data, total_students_found = \
+            scrape_with_thread_pool(scraper, combinations, args, num_workers)
 
-        # Get all results from the queue
-        results = []
-        while not result_queue.empty():
-            results.append(result_queue.get())
-
-        # Process results
-        for worker_id, status, data in results:
-            if status == "success":
-                combination, num_students = data
-                total_combinations_with_data += 1
-                total_students_found += num_students
-                logger.info(f"Worker {worker_id} successfully processed {combination} with {num_students} students")
-            elif status == "finished":
-                combinations_processed, combinations_with_data = data
-                total_combinations_tried += combinations_processed
-                logger.info(f"Worker {worker_id} finished processing {combinations_processed} combinations with {combinations_with_data} containing data")
+    elif num_workers > 1:
+        logger.info(f"Using {num_workers} worker processes")
+        total_combinations_tried, total_combinations_with_data, total_students_found = \
+            scrape_with_process_pool(scraper, combinations, args, num_workers, scraper_kwargs)
 
     else:
         # Use single-worker mode (original code)
@@ -2234,8 +2807,7 @@ def main():
     logger.info("="*80)
 
     # Close the scraper
-    if num_workers <= 1:  # Only close in single-worker mode, workers close their own scrapers
-        scraper.close()
+    scraper.close()
 
 
 if __name__ == "__main__":
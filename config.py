@@ -5,6 +5,8 @@ This module contains configuration settings for both the attendance and mid mark
 It includes portal URLs, credentials, and default settings for the scrapers.
 """
 
+from types import MappingProxyType
+
 # Portal URLs
 BASE_URL = "http://103.203.175.90:94"
 ATTENDANCE_PORTAL_URL = "http://103.203.175.90:94/attendance/attendanceTillADate.php"
@@ -26,15 +28,15 @@ USERNAME = "sumayya"
 PASSWORD = "09041994"
 
 # Default academic years (newest to oldest)
-DEFAULT_ACADEMIC_YEARS = [
+DEFAULT_ACADEMIC_YEARS = (
     "2024-25", "2023-24", "2022-23", "2021-22", "2020-21",
     "2019-20", "2018-19", "2017-18", "2016-17", "2015-16",
     "2014-15", "2013-14", "2012-13", "2011-12", "2010-11",
     "2009-10", "2008-09", "2007-08", "2006-07", "2005-06"
-]
+)
 
 # Default semesters (in order)
-DEFAULT_SEMESTERS = [
+DEFAULT_SEMESTERS = (
     "First Yr - First Sem",
     "First Yr - Second Sem",
     "Second Yr - First Sem",
@@ -43,23 +45,23 @@ DEFAULT_SEMESTERS = [
     "Third Yr - Second Sem",
     "Final Yr - First Sem",
     "Final Yr - Second Sem"
-]
+)
 
 # Default branches (in logical order)
-DEFAULT_BRANCHES = [
+DEFAULT_BRANCHES = (
     # Computer-related branches first
     "CSE", "CSE_DS", "CSE_AIML", "AI_DS", "IT",
     # Electronics branches
     "ECE", "EEE",
     # Core engineering branches
     "MECH", "CIVIL"
-]
+)
 
 # Default sections (including null section)
-DEFAULT_SECTIONS = ["-", "A", "B", "C", "D", "E", "F", "G", "H", "I", "J"]
+DEFAULT_SECTIONS = ("-", "A", "B", "C", "D", "E", "F", "G", "H", "I", "J")
 
 # Year/Semester codes mapping
-YEAR_SEM_CODES = {
+YEAR_SEM_CODES = MappingProxyType({
     "First Yr - First Sem": "11",
     "First Yr - Second Sem": "12",
     "Second Yr - First Sem": "21",
@@ -70,8 +72,8 @@ YEAR_SEM_CODES = {
     "Final Yr - Second Sem": "42",
     "Fourth Yr - First Sem": "41",  # Keep for backward compatibility
     "Fourth Yr - Second Sem": "42"   # Keep for backward compatibility
-}
-BRANCH_CODES = {
+})
+BRANCH_CODES = MappingProxyType({
     # Core branches
     "MECH": "7",
     "CSE": "5",
@@ -91,7 +93,10 @@ BRANCH_CODES = {
     "CSE-AIML": "33",  # Alternative for CSE_AIML
     "CSEAIML": "33",  # Alternative without separator
     "CSEDS": "32"  # Alternative without separator
-}
+})
+
+# Branch names accepted on the command line
+BRANCH_KEYS = tuple(BRANCH_CODES)
 
 # Default scraper settings
 DEFAULT_SETTINGS = {
@@ -42,6 +42,10 @@ SUPABASE_KEY = supabase_config.SUPABASE_KEY
 BUCKET_NAME = getattr(supabase_config.DEFAULT_SETTINGS, "bucket", "student_data")
 SOURCE_DIR = getattr(supabase_config.DEFAULT_SETTINGS, "source_dir", "/tmp/student_details")
 WORKERS = getattr(supabase_config.DEFAULT_SETTINGS, "workers", 32)
+# Page size when listing a storage folder for --skip-existing
+LIST_PAGE_SIZE = 1000
+# Files at least this large are streamed from disk instead of read into memory
+STREAM_UPLOAD_MIN_SIZE = 1 << 20
 
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
@@ -53,63 +57,130 @@ def get_all_files(base_dir):
         logger.warning(f"Source directory {base_dir} does not exist.")
         return
 
-    for root, _, files in os.walk(base_dir):
-        for file in files:
-            abs_path = os.path.join(root, file)
-            rel_path = os.path.relpath(abs_path, base_dir)
-            yield abs_path, rel_path.replace(os.sep, "/")  # Use '/' for Supabase paths
+    yield from _walk_files(str(base_dir))
 
-def upload_file(file_info, skip_existing=False):
-    """Upload a single file to Supabase Storage.
+def _walk_files(directory, prefix=""):
+    """Recursively yield (absolute_path, relative_path) for files in directory.
+
+    Args:
+        directory: Directory to scan
+        prefix: Relative path of directory, ending in '/' unless empty
+
+    Returns:
+        Iterator of (absolute_path, relative_path) tuples
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Like os.walk, don't descend into symlinked directories
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path, prefix + entry.name + "/")
+            elif entry.is_file():
+                yield entry.path, prefix + entry.name  # Use '/' for Supabase paths
+
+def list_existing_files(bucket, folders):
+    """List the files already stored in the given bucket folders.
+
+    Args:
+        bucket: Storage bucket client
+        folders: Folder paths within the bucket ('' for the top level)
+
+    Returns:
+        Set of relative paths of the files in those folders
+    """
+    existing = set()
+    for folder in folders:
+        offset = 0
+        while True:
+            entries = bucket.list(folder, {"limit": LIST_PAGE_SIZE, "offset": offset})
+            for entry in entries:
+                # Subfolders are listed too, without an id
+                if entry.get('id') is not None:
+                    existing.add(f"{folder}/{entry['name']}" if folder else entry['name'])
+            if len(entries) < LIST_PAGE_SIZE:
+                break
+            offset += LIST_PAGE_SIZE
+    return existing
+
+def upload_file(file_info, skip_existing=False, bucket=None, existing_files=None):
+    """Upload a single file to Supabase Storage, overwriting it if it exists.
 
     Args:
         file_info: Tuple of (absolute_path, relative_path)
         skip_existing: Whether to skip files that already exist in Supabase
+        bucket: Storage bucket client to upload with; defaults to BUCKET_NAME's
+        existing_files: Relative paths already in the bucket (see
+            list_existing_files); listed for this file's folder if None and
+            skip_existing is set
 
     Returns:
         Tuple of (success, message)
     """
     abs_path, rel_path = file_info
+    if bucket is None:
+        bucket = supabase.storage.from_(BUCKET_NAME)
 
     try:
         # Check if file exists in Supabase (if skip_existing is True)
         if skip_existing:
-            try:
-                # This will raise an exception if the file doesn't exist
-                supabase.storage.from_(BUCKET_NAME).get_public_url(rel_path)
+            if existing_files is None:
+                existing_files = list_existing_files(bucket, [rel_path.rpartition('/')[0]])
+            if rel_path in existing_files:
                 return True, f"Skipped existing file: {rel_path}"
-            except Exception:
-                # File doesn't exist, continue with upload
-                pass
 
-        # Read file content
+        # Small files are read into memory; large ones are uploaded from the open
+        # file handle so the HTTP client streams them instead of every worker
+        # holding a whole file
         with open(abs_path, 'rb') as f:
-            file_content = f.read()
+            if os.fstat(f.fileno()).st_size < STREAM_UPLOAD_MIN_SIZE:
+                file_content = f.read()
+            else:
+                file_content = f
+
+            return _upload_content(bucket, rel_path, file_content)
+
+    except Exception as e:
+        return False, f"Error uploading {rel_path}: {str(e)}"
+
+def _upload_content(bucket, rel_path, file_content):
+    """Upload file content to the bucket, overwriting any existing file.
 
+    Args:
+        bucket: Storage bucket client
+        rel_path: Destination path within the bucket
+        file_content: File bytes, or an open binary file to stream from
+
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
         # Upload to Supabase
         # The API might have changed, so let's try different approaches
         try:
             # Only log essential information
             logger.info(f"Uploading {rel_path} to bucket {BUCKET_NAME}")
 
-            # Try to delete the file first if it exists (to handle the duplicate error)
-            try:
-                supabase.storage.from_(BUCKET_NAME).remove([rel_path])
-                logger.debug(f"Removed existing file: {rel_path}")
-            except Exception as e:
-                # Ignore errors when trying to delete (file might not exist)
-                logger.debug(f"File may not exist yet: {rel_path}")
-
-            # New API (v2+)
-            result = supabase.storage.from_(BUCKET_NAME).upload(
+            # New API (v2+): upsert replaces an existing file in the same request
+            result = bucket.upload(
                 rel_path,
-                file_content
+                file_content,
+                file_options={"upsert": "true"}
             )
         except TypeError as te:
             logger.debug(f"TypeError: {str(te)}")
             try:
-                # Older API
-                result = supabase.storage.from_(BUCKET_NAME).upload(
+                # Older API, without upsert: delete the file first if it exists
+                # (to handle the duplicate error)
+                try:
+                    bucket.remove([rel_path])
+                    logger.debug(f"Removed existing file: {rel_path}")
+                except Exception as e:
+                    # Ignore errors when trying to delete (file might not exist)
+                    logger.debug(f"File may not exist yet: {rel_path}")
+
+                # Rewind in case the first attempt consumed the stream
+                if hasattr(file_content, 'seek'):
+                    file_content.seek(0)
+                result = bucket.upload(
                     rel_path,
                     file_content
                 )
@@ -165,10 +236,25 @@ def upload_folder(source_dir, bucket_name=BUCKET_NAME, workers=WORKERS, skip_exi
     error_count = 0
     errors = []
 
+    # One bucket client for all uploads; its HTTP connection pool is shared by the
+    # worker threads, which spend their time waiting on the network with the GIL released
+    bucket = supabase.storage.from_(bucket_name)
+
+    # List what is already uploaded once per folder, rather than asking per file
+    existing_files = None
+    if skip_existing:
+        folders = {rel_path.rpartition('/')[0] for _, rel_path in all_files}
+        try:
+            existing_files = list_existing_files(bucket, folders)
+            logger.info(f"Found {len(existing_files)} files already in {bucket_name}")
+        except Exception as e:
+            logger.warning(f"Could not list existing files, uploading everything: {e}")
+            existing_files = set()
+
     with ThreadPoolExecutor(max_workers=workers) as executor:
         # Submit all upload tasks
         future_to_file = {
-            executor.submit(upload_file, file_info, skip_existing): file_info[1]
+            executor.submit(upload_file, file_info, skip_existing, bucket, existing_files): file_info[1]
             for file_info in all_files
         }
 
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Gunicorn configuration for the NBKRIST Student Portal web interface.
+
+A single worker process keeps all TaskMaster job state in one place; its
+threads serve status polls and event streams concurrently, and keep-alive
+lets polling clients reuse their connection. Event streams only hold a thread
+for a few seconds (app.SSE_MAX_STREAM_SECONDS) before the page switches to
+polling, so open status pages don't use up the threads.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+keepalive = 30
+timeout = 120
@@ -5,13 +5,23 @@ This module handles authentication to the college portal.
 """
 
 import os
+import json
 import sys
 import time
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from typing import Dict, Optional, Tuple
 
+# Prefer the C-based lxml parser; fall back to the pure-Python parser if it's missing
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 # Import configuration
 from config import (
     USERNAME, PASSWORD, ATTENDANCE_PORTAL_URL, MID_MARKS_PORTAL_URL, DEFAULT_SETTINGS,
@@ -32,17 +42,43 @@ logger = logging.getLogger("login_utils")
 # Use the imported URLs from config.py
 # These are already defined in config.py
 
-def create_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+# Server responses worth retrying: rate limiting and transient gateway errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def create_session(headers: Optional[Dict[str, str]] = None,
+                   max_retries: int = 0) -> requests.Session:
     """
     Create a session object with default headers.
 
+    With max_retries set, GET requests that fail to connect or return one of
+    RETRY_STATUS_CODES are retried inside the connection pool with exponential
+    backoff, honouring any Retry-After header. Form POSTs are never retried
+    there, so a submission isn't sent twice.
+
     Args:
         headers: Optional HTTP headers for the requests
+        max_retries: Maximum number of retries per GET request (0 leaves
+            retrying to the caller)
 
     Returns:
         requests.Session object
     """
     session = requests.Session()
+
+    if max_retries > 0:
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=1,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            # Hand the last response back so callers' raise_for_status() reports it
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
     default_headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -76,7 +112,7 @@ def login(session: requests.Session, username: str = USERNAME, password: str = P
         response.raise_for_status()
 
         # Parse the login page
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, HTML_PARSER)
 
         # Log the form structure for debugging
         form = soup.find('form')
@@ -152,7 +188,7 @@ def login(session: requests.Session, username: str = USERNAME, password: str = P
             return True, ""
         else:
             # Try to extract error message from the response
-            error_soup = BeautifulSoup(login_response.text, 'html.parser')
+            error_soup = BeautifulSoup(login_response.text, HTML_PARSER)
             error_msg = "Login failed - please check your credentials in config.py (USERNAME and PASSWORD variables). These credentials change frequently."
 
             # Look for error messages in common locations
@@ -187,7 +223,7 @@ def login_to_attendance(session: requests.Session, username: str = USERNAME, pas
         response.raise_for_status()
 
         # Parse the login page
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, HTML_PARSER)
 
         # Log the form structure for debugging
         form = soup.find('form')
@@ -261,7 +297,7 @@ def login_to_attendance(session: requests.Session, username: str = USERNAME, pas
             return True, ""
         else:
             # Try to extract error message from the response
-            error_soup = BeautifulSoup(login_response.text, 'html.parser')
+            error_soup = BeautifulSoup(login_response.text, HTML_PARSER)
             error_msg = "Attendance login failed - please check your credentials in config.py (USERNAME and PASSWORD variables). These credentials change frequently."
 
             # Look for error messages in common locations
@@ -279,12 +315,13 @@ def login_to_attendance(session: requests.Session, username: str = USERNAME, pas
 
 
 
-def is_logged_in(session: requests.Session) -> bool:
+def is_logged_in(session: requests.Session, timeout: Optional[float] = None) -> bool:
     """
     Check if the session is logged in.
 
     Args:
         session: requests.Session object
+        timeout: Seconds to wait for the portal to answer (None waits indefinitely)
 
     Returns:
         Boolean indicating login status
@@ -292,7 +329,7 @@ def is_logged_in(session: requests.Session) -> bool:
     try:
         # Try to access a page that requires authentication
         # We'll use the attendance page as it requires login
-        response = session.get(ATTENDANCE_PORTAL_URL)
+        response = session.get(ATTENDANCE_PORTAL_URL, timeout=timeout)
 
         # Check if we're redirected to the login page
         current_url = response.url
@@ -306,3 +343,66 @@ def is_logged_in(session: requests.Session) -> bool:
     except Exception as e:
         logger.error(f"Error checking login status: {str(e)}")
         return False
+
+def save_session_cookies(session: requests.Session, path: str, username: str = USERNAME) -> bool:
+    """
+    Save a logged-in session's cookies so a later run can skip logging in.
+
+    The file is only readable by the current user, as the cookies are as good
+    as the password until the portal session expires.
+
+    Args:
+        session: Logged-in requests.Session object
+        path: File to write the cookies to
+        username: Username the session is logged in as
+
+    Returns:
+        Boolean indicating success
+    """
+    cookies = [
+        {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path}
+        for cookie in session.cookies
+    ]
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Write to a temporary file and rename it, so concurrent scrapers never read half a file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'username': username, 'cookies': cookies}, f)
+        os.replace(temp_path, path)
+        logger.debug(f"Saved {len(cookies)} session cookies to {path}")
+        return True
+    except OSError as e:
+        logger.warning(f"Could not save session cookies: {str(e)}")
+        return False
+
+def load_session_cookies(session: requests.Session, path: str, username: str = USERNAME) -> bool:
+    """
+    Load cookies saved by save_session_cookies into a session.
+
+    Args:
+        session: requests.Session object
+        path: File the cookies were saved to
+        username: Username the session should be logged in as; cookies saved
+            for another user are ignored
+
+    Returns:
+        Boolean indicating whether any cookies were loaded
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read saved session cookies: {str(e)}")
+        return False
+
+    if saved.get('username') != username or not saved.get('cookies'):
+        return False
+
+    for cookie in saved['cookies']:
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+    logger.debug(f"Loaded {len(saved['cookies'])} session cookies from {path}")
+    return True
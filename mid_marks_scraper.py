@@ -53,7 +53,7 @@ from config import (
     USERNAME, PASSWORD, MID_MARKS_PORTAL_URL,
     DEFAULT_ACADEMIC_YEARS, DEFAULT_SEMESTERS,
     DEFAULT_BRANCHES, DEFAULT_SECTIONS,
-    YEAR_SEM_CODES, BRANCH_CODES, DEFAULT_SETTINGS
+    YEAR_SEM_CODES, BRANCH_CODES, BRANCH_KEYS, DEFAULT_SETTINGS
 )
 
 # Configure logging
@@ -2603,13 +2603,13 @@ def should_skip_combination(academic_year: str, semester: str, branch: str, sect
     return False  # No recent files found, don't skip
 
 
-def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue: queue.Queue, args: argparse.Namespace):
+def worker_function(worker_id: int, combination_queue: queue.SimpleQueue, result_queue: queue.Queue, args: argparse.Namespace):
     """
     Worker function to process combinations from a queue.
 
     Args:
         worker_id: ID of the worker
-        combination_queue: Queue of combinations to process
+        combination_queue: Queue of combinations to process, ending with a None per worker
         result_queue: Queue to store results
         args: Command line arguments
     """
@@ -2660,14 +2660,14 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
 
     while True:
         try:
-            # Get the next combination from the queue (non-blocking)
-            try:
-                combination_index, combination = combination_queue.get(block=False)
-                academic_year, semester, branch, section = combination
-            except queue.Empty:
+            # Get the next combination from the queue; None marks the end
+            item = combination_queue.get()
+            if item is None:
                 # No more combinations to process
                 worker_logger.info(f"Worker {worker_id}: No more combinations to process. Exiting.")
                 break
+            combination_index, combination = item
+            academic_year, semester, branch, section = combination
 
             worker_logger.info(f"Worker {worker_id}: Processing combination {combination_index}: {academic_year}, {semester}, {branch}, {section}")
             combinations_processed += 1
@@ -2677,9 +2677,6 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
                                       args.data_dir, args.cache_ttl, args.force_update):
                 worker_logger.info(f"Worker {worker_id}: Skipping combination {combination_index} due to cache")
                 result_queue.put((worker_id, "cached", combination))
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
                 continue
 
             # Add delay between requests if specified
@@ -2692,9 +2689,6 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
             if not result_soup:
                 worker_logger.warning(f"Worker {worker_id}: Failed to get results for {academic_year}, {semester}, {branch}, {section}")
                 result_queue.put((worker_id, "no_results", combination))
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
                 continue
 
             # Extract mid marks data
@@ -2711,9 +2705,6 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
                     worker_logger.warning(f"Worker {worker_id}: Found {empty_combinations_in_a_row} empty combinations in a row. Stopping.")
                     break
 
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
                 continue
 
             # Reset the counter since we found data
@@ -2736,17 +2727,10 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
 
             # Put the result in the result queue
             result_queue.put((worker_id, "success", (combination, len(student_data))))
-            # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-            if hasattr(combination_queue, 'task_done'):
-                combination_queue.task_done()
 
         except Exception as e:
             worker_logger.error(f"Worker {worker_id}: Error processing combination: {str(e)}")
             result_queue.put((worker_id, "error", (combination if 'combination' in locals() else None, str(e))))
-            if 'combination' in locals():
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
 
     # Clean up
     try:
@@ -2758,6 +2742,68 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
     result_queue.put((worker_id, "finished", (combinations_processed, combinations_with_data)))
 
 
+def feed_combinations(combination_queue: Any, combinations: List[Tuple[str, str, str, str]], num_workers: int):
+    """
+    Put numbered combinations on the queue, followed by one None per worker.
+
+    Args:
+        combination_queue: Queue the workers take combinations from
+        combinations: Combinations to process
+        num_workers: Number of workers reading from the queue
+    """
+    for i, combination in enumerate(combinations):
+        combination_queue.put((i+1, combination))
+
+    # One end marker per worker
+    for _ in range(num_workers):
+        combination_queue.put(None)
+
+
+# Statuses a worker sends last, right before it exits
+FINAL_WORKER_STATUSES = ("finished", "auth_failed", "nav_failed")
+
+
+def collect_worker_results(result_queue: queue.Queue, workers: List[Any]) -> List[Tuple[int, str, Any]]:
+    """
+    Collect worker results while the workers run.
+
+    Reading as results arrive keeps the queue from filling up; a worker
+    process can't exit while results it put are still waiting in the pipe,
+    so joining before draining can hang on long runs.
+
+    Args:
+        result_queue: Queue the workers put results on
+        workers: Started worker threads or processes
+
+    Returns:
+        List of (worker_id, status, data) tuples
+    """
+    results = []
+    finished_workers = 0
+    while finished_workers < len(workers):
+        try:
+            result = result_queue.get(timeout=1)
+        except queue.Empty:
+            # Stop waiting if every worker exited without a final status (e.g. crashed)
+            if not any(worker.is_alive() for worker in workers):
+                break
+            continue
+
+        results.append(result)
+        if result[1] in FINAL_WORKER_STATUSES:
+            finished_workers += 1
+
+    # Pick up anything left behind by workers that exited early
+    while True:
+        try:
+            results.append(result_queue.get(timeout=0.1))
+        except queue.Empty:
+            break
+
+    return results
+
+
+
 def main():
     """Main function to run the scraper."""
     parser = argparse.ArgumentParser(description='Scrape mid marks data from college website')
@@ -2767,7 +2813,7 @@ def main():
     parser.add_argument('--no-csv', action='store_true', help='Disable CSV file generation')
     parser.add_argument('--academic-year', choices=DEFAULT_ACADEMIC_YEARS, help='Academic year')
     parser.add_argument('--semester', choices=DEFAULT_SEMESTERS, help='Semester')
-    parser.add_argument('--branch', choices=list(BRANCH_CODES.keys()), help='Branch')
+    parser.add_argument('--branch', choices=BRANCH_KEYS, help='Branch')
     parser.add_argument('--section', choices=DEFAULT_SECTIONS, help='Section')
     parser.add_argument('--data-dir', default=DEFAULT_SETTINGS['data_dir'], help='Directory to store student data')
     parser.add_argument('--force-update', action='store_true', help='Force update even if data already exists')
@@ -2785,7 +2831,7 @@ def main():
     parser.add_argument('--reverse', action='store_true', help='Reverse the order of combinations (oldest first)')
     parser.add_argument('--only-years', nargs='+', choices=DEFAULT_ACADEMIC_YEARS, help='Only scrape specific academic years')
     parser.add_argument('--only-semesters', nargs='+', choices=DEFAULT_SEMESTERS, help='Only scrape specific semesters')
-    parser.add_argument('--only-branches', nargs='+', choices=list(BRANCH_CODES.keys()), help='Only scrape specific branches')
+    parser.add_argument('--only-branches', nargs='+', choices=BRANCH_KEYS, help='Only scrape specific branches')
     parser.add_argument('--only-sections', nargs='+', choices=DEFAULT_SECTIONS, help='Only scrape specific sections')
     parser.add_argument('--cache-ttl', type=int, default=60, help='Cache TTL in minutes (0 to disable caching)')
 
@@ -2907,22 +2953,17 @@ def main():
     if num_workers > 1:
         logger.info(f"Using {num_workers} workers in {worker_mode} mode")
 
-        # Create queues for combinations and results
+        # Create queues for combinations and results; combinations don't need
+        # task tracking or timeouts, so they go on the lighter SimpleQueue
         if worker_mode == 'thread':
             # Use thread-safe queues
-            combination_queue = queue.Queue()
+            combination_queue = queue.SimpleQueue()
             result_queue = queue.Queue()
         else:
             # Use process-safe queues
-            combination_queue = multiprocessing.Queue()
+            combination_queue = multiprocessing.SimpleQueue()
             result_queue = multiprocessing.Queue()
 
-        # Add combinations to the queue
-        for i, combination in enumerate(combinations):
-            combination_queue.put((i+1, combination))
-
-        logger.info(f"Added {len(combinations)} combinations to the queue")
-
         # Create and start workers
         workers = []
         if worker_mode == 'thread':
@@ -2946,7 +2987,14 @@ def main():
                 worker.start()
                 logger.info(f"Started worker process {i+1}")
 
-        # Wait for all workers to finish
+        # Add combinations to the queue from a background thread; a process
+        # SimpleQueue blocks once its pipe is full, until the workers read from it
+        feeder = threading.Thread(target=feed_combinations, args=(combination_queue, combinations, num_workers), daemon=True)
+        feeder.start()
+        logger.info(f"Adding {len(combinations)} combinations to the queue")
+
+        # Get results from the queue as they arrive, then wait for all workers to finish
+        results = collect_worker_results(result_queue, workers)
         for worker in workers:
             worker.join()
 
@@ -2957,11 +3005,6 @@ def main():
         total_combinations_with_data = 0
         total_students_found = 0
 
-        # Get all results from the queue
-        results = []
-        while not result_queue.empty():
-            results.append(result_queue.get())
-
         # Process results
         for worker_id, status, data in results:
             if status == "success":
@@ -63,7 +63,7 @@ from config import (
     USERNAME, PASSWORD, PERSONAL_DETAILS_URL,
     DEFAULT_ACADEMIC_YEARS, DEFAULT_SEMESTERS,
     DEFAULT_BRANCHES, DEFAULT_SECTIONS,
-    YEAR_SEM_CODES, BRANCH_CODES, DEFAULT_SETTINGS
+    YEAR_SEM_CODES, BRANCH_CODES, BRANCH_KEYS, DEFAULT_SETTINGS
 )
 
 # Configure logging
@@ -1583,13 +1583,13 @@ class PersonalDetailsScraper:
         return success_count, update_count
 
 
-def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue: queue.Queue, args: argparse.Namespace):
+def worker_function(worker_id: int, combination_queue: queue.SimpleQueue, result_queue: queue.Queue, args: argparse.Namespace):
     """
     Worker function to process combinations from a queue.
 
     Args:
         worker_id: ID of the worker
-        combination_queue: Queue of combinations to process
+        combination_queue: Queue of combinations to process, ending with a None per worker
         result_queue: Queue to store results
         args: Command line arguments
     """
@@ -1663,28 +1663,25 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
             # We don't break here, we'll continue and let the branch change reset the counter
 
         try:
-            # Get the next combination from the queue (non-blocking)
-            try:
-                combination_index, combination = combination_queue.get(block=False)
-                academic_year, year_of_study, branch, section = combination
-
-                # Reset empty combinations counter when branch changes
-                if branch != current_branch:
-                    if empty_combinations_in_a_row > 0:
-                        worker_logger.info(f"Worker {worker_id}: Changing branch from {current_branch} to {branch}, resetting empty combinations counter")
-                        empty_combinations_in_a_row = 0
-                    current_branch = branch
-                elif empty_combinations_in_a_row >= max_empty_combinations:
-                    # Skip this combination if we've seen too many empty combinations in a row for this branch
-                    worker_logger.warning(f"Worker {worker_id}: Skipping combination for branch {branch} due to too many empty combinations in a row")
-                    # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                    if hasattr(combination_queue, 'task_done'):
-                        combination_queue.task_done()
-                    continue
-            except queue.Empty:
+            # Get the next combination from the queue; None marks the end
+            item = combination_queue.get()
+            if item is None:
                 # No more combinations to process
                 worker_logger.info(f"Worker {worker_id}: No more combinations to process. Exiting.")
                 break
+            combination_index, combination = item
+            academic_year, year_of_study, branch, section = combination
+
+            # Reset empty combinations counter when branch changes
+            if branch != current_branch:
+                if empty_combinations_in_a_row > 0:
+                    worker_logger.info(f"Worker {worker_id}: Changing branch from {current_branch} to {branch}, resetting empty combinations counter")
+                    empty_combinations_in_a_row = 0
+                current_branch = branch
+            elif empty_combinations_in_a_row >= max_empty_combinations:
+                # Skip this combination if we've seen too many empty combinations in a row for this branch
+                worker_logger.warning(f"Worker {worker_id}: Skipping combination for branch {branch} due to too many empty combinations in a row")
+                continue
 
             worker_logger.info(f"Worker {worker_id}: Processing combination {combination_index}: {academic_year}, {year_of_study}, {branch}, {section}")
             combinations_processed += 1
@@ -1705,9 +1702,6 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
             if branch in excluded_branches:
                 worker_logger.warning(f"Worker {worker_id}: Branch {branch} is excluded from scraping. Skipping.")
                 result_queue.put((worker_id, "excluded_branch", combination))
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
                 continue
 
             # Select form filters and submit
@@ -1718,9 +1712,6 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
                 # Increment the empty combinations counter
                 empty_combinations_in_a_row += 1
                 worker_logger.warning(f"Worker {worker_id}: Empty combinations in a row: {empty_combinations_in_a_row}/{max_empty_combinations}")
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
                 # Add a small delay before continuing to the next combination
                 time.sleep(1)
                 continue
@@ -1736,9 +1727,6 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
                 # Increment the empty combinations counter
                 empty_combinations_in_a_row += 1
                 worker_logger.warning(f"Worker {worker_id}: Empty combinations in a row: {empty_combinations_in_a_row}/{max_empty_combinations}")
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
                 # Add a small delay before continuing to the next combination
                 time.sleep(1)
                 continue
@@ -1769,17 +1757,10 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
 
             # Put the result in the result queue
             result_queue.put((worker_id, "success", (combination, len(students))))
-            # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-            if hasattr(combination_queue, 'task_done'):
-                combination_queue.task_done()
 
         except Exception as e:
             worker_logger.error(f"Worker {worker_id}: Error processing combination: {str(e)}")
             result_queue.put((worker_id, "error", (combination if 'combination' in locals() else None, str(e))))
-            if 'combination' in locals():
-                # Skip task_done for process mode as multiprocessing.Queue doesn't have this method
-                if hasattr(combination_queue, 'task_done'):
-                    combination_queue.task_done()
 
     # Clean up
     try:
@@ -1792,6 +1773,68 @@ def worker_function(worker_id: int, combination_queue: queue.Queue, result_queue
     result_queue.put((worker_id, "finished", (combinations_processed, combinations_with_data, total_students)))
 
 
+def feed_combinations(combination_queue: Any, combinations: List[Tuple[str, str, str, str]], num_workers: int):
+    """
+    Put numbered combinations on the queue, followed by one None per worker.
+
+    Args:
+        combination_queue: Queue the workers take combinations from
+        combinations: Combinations to process
+        num_workers: Number of workers reading from the queue
+    """
+    for i, combination in enumerate(combinations):
+        combination_queue.put((i+1, combination))
+
+    # One end marker per worker
+    for _ in range(num_workers):
+        combination_queue.put(None)
+
+
+# Statuses a worker sends last, right before it exits
+FINAL_WORKER_STATUSES = ("finished", "auth_failed", "nav_failed")
+
+
+def collect_worker_results(result_queue: queue.Queue, workers: List[Any]) -> List[Tuple[int, str, Any]]:
+    """
+    Collect worker results while the workers run.
+
+    Reading as results arrive keeps the queue from filling up; a worker
+    process can't exit while results it put are still waiting in the pipe,
+    so joining before draining can hang on long runs.
+
+    Args:
+        result_queue: Queue the workers put results on
+        workers: Started worker threads or processes
+
+    Returns:
+        List of (worker_id, status, data) tuples
+    """
+    results = []
+    finished_workers = 0
+    while finished_workers < len(workers):
+        try:
+            result = result_queue.get(timeout=1)
+        except queue.Empty:
+            # Stop waiting if every worker exited without a final status (e.g. crashed)
+            if not any(worker.is_alive() for worker in workers):
+                break
+            continue
+
+        results.append(result)
+        if result[1] in FINAL_WORKER_STATUSES:
+            finished_workers += 1
+
+    # Pick up anything left behind by workers that exited early
+    while True:
+        try:
+            results.append(result_queue.get(timeout=0.1))
+        except queue.Empty:
+            break
+
+    return results
+
+
+
 def main():
     """Main function to run the scraper."""
     parser = argparse.ArgumentParser(description='Scrape personal details from college website')
@@ -1800,7 +1843,7 @@ def main():
     parser.add_argument('--output', default='personal_details_data.csv', help='Output file name')
     parser.add_argument('--academic-year', choices=DEFAULT_ACADEMIC_YEARS, help='Academic year')
     parser.add_argument('--year-of-study', dest='year_of_study', choices=DEFAULT_SEMESTERS, help='Year of study')
-    parser.add_argument('--branch', choices=list(BRANCH_CODES.keys()), help='Branch')
+    parser.add_argument('--branch', choices=BRANCH_KEYS, help='Branch')
     parser.add_argument('--section', choices=DEFAULT_SECTIONS, help='Section')
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
@@ -1817,7 +1860,7 @@ def main():
     parser.add_argument('--only-years', nargs='+', choices=DEFAULT_ACADEMIC_YEARS, help='Only scrape specific academic years')
     parser.add_argument('--only-semesters', nargs='+', choices=DEFAULT_SEMESTERS, help='Only scrape specific semesters')
     parser.add_argument('--max-empty-combinations', type=int, default=5, help='Maximum number of empty combinations in a row before stopping')
-    parser.add_argument('--only-branches', nargs='+', choices=list(BRANCH_CODES.keys()), help='Only scrape specific branches')
+    parser.add_argument('--only-branches', nargs='+', choices=BRANCH_KEYS, help='Only scrape specific branches')
     parser.add_argument('--only-sections', nargs='+', choices=DEFAULT_SECTIONS, help='Only scrape specific sections')
 
     # Multi-worker options
@@ -1896,17 +1939,17 @@ def main():
         # Determine which academic years to use
         academic_years = args.only_years if args.only_years else DEFAULT_ACADEMIC_YEARS
         if args.academic_year and args.academic_year not in academic_years:
-            academic_years = [args.academic_year] + academic_years
+            academic_years = [args.academic_year] + list(academic_years)
 
         # Determine which years of study to use
         years_of_study = args.only_semesters if args.only_semesters else DEFAULT_SEMESTERS
         if args.year_of_study and args.year_of_study not in years_of_study:
-            years_of_study = [args.year_of_study] + years_of_study
+            years_of_study = [args.year_of_study] + list(years_of_study)
 
         # Determine which branches to use
         branches = args.only_branches if args.only_branches else DEFAULT_BRANCHES
         if args.branch and args.branch not in branches:
-            branches = [args.branch] + branches
+            branches = [args.branch] + list(branches)
 
         # Exclude MTech branches
         excluded_branches = ["MTech_PS", "MTech_CSE", "MTech_ECE", "MTech_AMS"]
@@ -1915,7 +1958,7 @@ def main():
         # Determine which sections to use
         sections = args.only_sections if args.only_sections else DEFAULT_SECTIONS
         if args.section and args.section not in sections:
-            sections = [args.section] + sections
+            sections = [args.section] + list(sections)
 
         # Create all combinations
         combinations = [
@@ -1944,22 +1987,17 @@ def main():
     if num_workers > 1:
         logger.info(f"Using {num_workers} workers in {worker_mode} mode")
 
-        # Create queues for combinations and results
+        # Create queues for combinations and results; combinations don't need
+        # task tracking or timeouts, so they go on the lighter SimpleQueue
         if worker_mode == 'thread':
             # Use thread-safe queues
-            combination_queue = queue.Queue()
+            combination_queue = queue.SimpleQueue()
             result_queue = queue.Queue()
         else:
             # Use process-safe queues
-            combination_queue = multiprocessing.Queue()
+            combination_queue = multiprocessing.SimpleQueue()
             result_queue = multiprocessing.Queue()
 
-        # Add combinations to the queue
-        for i, combination in enumerate(combinations):
-            combination_queue.put((i+1, combination))
-
-        logger.info(f"Added {len(combinations)} combinations to the queue")
-
         # Create and start workers
         workers = []
         if worker_mode == 'thread':
@@ -1983,7 +2021,14 @@ def main():
                 worker.start()
                 logger.info(f"Started worker process {i+1}")
 
-        # Wait for all workers to finish
+        # Add combinations to the queue from a background thread; a process
+        # SimpleQueue blocks once its pipe is full, until the workers read from it
+        feeder = threading.Thread(target=feed_combinations, args=(combination_queue, combinations, num_workers), daemon=True)
+        feeder.start()
+        logger.info(f"Adding {len(combinations)} combinations to the queue")
+
+        # Get results from the queue as they arrive, then wait for all workers to finish
+        results = collect_worker_results(result_queue, workers)
         for worker in workers:
             worker.join()
 
@@ -1994,11 +2039,6 @@ def main():
         total_combinations_with_data = 0
         total_students_found = 0
 
-        # Get all results from the queue
-        results = []
-        while not result_queue.empty():
-            results.append(result_queue.get())
-
         # Process results
         for worker_id, status, data in results:
             if status == "success":
@@ -12,12 +12,14 @@ import time
 import json
 import logging
 import threading
+import shutil
 import subprocess
-import uuid
+from collections import deque
+from itertools import islice
 from enum import Enum
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union, Callable
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from queue import Queue
 
 # Configure logging
@@ -31,6 +33,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger("taskmaster")
 
+# Number of log lines kept in memory per job
+JOB_LOG_TAIL = int(os.environ.get('JOB_LOG_TAIL', '200'))
+
+# Niceness applied to scraper subprocesses so they don't starve the web server
+SCRAPER_NICE = int(os.environ.get('SCRAPER_NICE', '10'))
+
+# Concurrent requests the attendance scraper makes to the portal; kept small to stay polite
+ATTENDANCE_WORKERS = int(os.environ.get('ATTENDANCE_WORKERS', '4'))
+
+# Command prefix that starts scraper subprocesses at that niceness. The nice
+# binary is used rather than a preexec_fn, which isn't safe to run between
+# fork and exec in this multi-threaded process.
+_nice_path = shutil.which('nice') if SCRAPER_NICE > 0 else None
+NICE_PREFIX = [_nice_path, '-n', str(SCRAPER_NICE)] if _nice_path else []
+
+# Crockford's base32 alphabet used by ULIDs
+ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def new_job_id() -> str:
+    """Generate a ULID: a 48-bit millisecond timestamp followed by 80 random bits.
+
+    ULIDs sort lexicographically by creation time, so the jobs dictionary
+    stays in chronological order.
+
+    Returns:
+        26-character ULID string
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    chars = []
+    for _ in range(26):
+        chars.append(ULID_ALPHABET[value & 0x1F])
+        value >>= 5
+    return ''.join(reversed(chars))
+
 class JobStatus(Enum):
     """Enum for job status."""
     PENDING = "pending"
@@ -42,6 +78,9 @@ class JobStatus(Enum):
 class Job:
     """Class representing a job."""
 
+    # Attributes that don't appear in to_dict() and so don't invalidate its cache
+    _UNCACHED_ATTRS = frozenset({'_generation', '_generation_lock', '_dict_cache', 'version', 'process', '_on_change', '_log_lock'})
+
     def __init__(self, id: str, scripts: List[str], params: Dict[str, Any]):
         """Initialize a job.
 
@@ -50,6 +89,9 @@ class Job:
             scripts: List of script names to run
             params: Parameters to pass to the scripts
         """
+        self._generation_lock = threading.Lock()
+        self._generation = 0
+        self._dict_cache = None
         self.id = id
         self.scripts = scripts
         self.params = params
@@ -57,14 +99,38 @@ class Job:
         self.current_script = None
         self.progress = 0
         self.results = {}
-        self.logs = []
+        self.logs = deque(maxlen=JOB_LOG_TAIL)
         self.start_time = None
         self.end_time = None
         self.process = None
+        self.log_seq = 0
+        self._log_lock = threading.Lock()
+        self.version = 0
+        self._on_change = None
+
+    def __setattr__(self, name: str, value: Any):
+        """Set an attribute, invalidating the cached to_dict() result if needed."""
+        object.__setattr__(self, name, value)
+        # Bump after setting, so a to_dict() that sees the new generation also sees
+        # the new value; the worker and request threads both set attributes, so the
+        # increment is locked to not lose one
+        if name not in self._UNCACHED_ATTRS:
+            with self._generation_lock:
+                self.__dict__['_generation'] += 1
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert job to dictionary."""
-        return {
+        """Convert job to dictionary.
+
+        The result is cached until the job changes, so callers must not modify it.
+        """
+        cached = self._dict_cache
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+
+        # Tag the cache with the generation it was built from, so a change made
+        # while building is never masked by a stale entry
+        generation = self._generation
+        data = {
             "id": self.id,
             "scripts": self.scripts,
             "params": self.params,
@@ -72,20 +138,71 @@ class Job:
             "current_script": self.current_script,
             "progress": self.progress,
             "results": self.results,
-            "logs": self.logs[-50:],  # Only include the last 50 logs
+            "logs": self.tail_logs(50),  # Only include the last 50 logs
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "end_time": self.end_time.isoformat() if self.end_time else None,
         }
+        self._dict_cache = (generation, data)
+        return data
+
+    def tail_logs(self, count: int = 50) -> List[str]:
+        """Return the most recent log lines.
+
+        Args:
+            count: Maximum number of lines to return
+
+        Returns:
+            List of log lines, oldest first
+        """
+        # Copy first; deques can't be sliced and must not be iterated while the worker appends
+        with self._log_lock:
+            return list(self.logs)[-count:]
+
+    def logs_since(self, since: Optional[int], limit: int = 50) -> Tuple[List[str], int, bool]:
+        """Return the log lines added after a given sequence number.
+
+        Args:
+            since: Value of `log_seq` the caller has already seen, or None
+            limit: Maximum number of lines to return
+
+        Returns:
+            Tuple of (new log lines, current log_seq, reset flag). The reset flag
+            is True when the lines don't continue from `since`, in which case the
+            caller should replace its logs instead of appending.
+        """
+        with self._log_lock:
+            logs = list(self.logs)
+            log_seq = self.log_seq
+
+        if since is None or since < 0 or since > log_seq:
+            return logs[-limit:], log_seq, True
+
+        missing = log_seq - since
+        if missing == 0:
+            return [], log_seq, False
+
+        count = min(missing, limit, len(logs))
+        return logs[-count:], log_seq, count < missing
 
     def add_log(self, message: str):
         """Add a log message to the job."""
         timestamp = datetime.now().isoformat()
-        self.logs.append(f"[{timestamp}] {message}")
+        with self._log_lock:
+            self.logs.append(f"[{timestamp}] {message}")
+            self.log_seq += 1
         logger.info(f"Job {self.id}: {message}")
+        self._touch()
 
     def update_progress(self, progress: int):
         """Update the job progress."""
         self.progress = progress
+        self._touch()
+
+    def _touch(self):
+        """Bump the job version and notify any listener waiting for updates."""
+        self.version += 1
+        if self._on_change:
+            self._on_change(self)
 
 class TaskMaster:
     """Class for managing jobs."""
@@ -98,6 +215,8 @@ class TaskMaster:
         self.worker_thread = threading.Thread(target=self._worker, daemon=True)
         self.worker_thread.start()
         self.lock = threading.Lock()
+        self.update_condition = threading.Condition()
+        self.version = 0
         self.last_worker_activity = time.time()
         self.last_monitor_activity = time.time()
         self.last_supervisor_activity = time.time()
@@ -122,12 +241,14 @@ class TaskMaster:
         Returns:
             The created job
         """
-        job_id = str(uuid.uuid4())
+        job_id = new_job_id()
         job = Job(id=job_id, scripts=scripts, params=params)
+        job._on_change = self._notify_job_change
 
         with self.lock:
             self.jobs[job_id] = job
 
+        self.bump_version()
         return job
 
     def start_job(self, job_id: str) -> bool:
@@ -170,8 +291,8 @@ class TaskMaster:
             if job.status == JobStatus.RUNNING and self.active_job == job_id and job.process:
                 try:
                     job.process.terminate()
-                    job.add_log("Job cancelled")
                     job.status = JobStatus.CANCELLED
+                    job.add_log("Job cancelled")
                     self.active_job = None
                     return True
                 except Exception as e:
@@ -198,6 +319,32 @@ class TaskMaster:
         with self.lock:
             return self.jobs.get(job_id)
 
+    def bump_version(self):
+        """Mark the job list as changed so cached snapshots get rebuilt."""
+        with self.update_condition:
+            self.version += 1
+
+    def _notify_job_change(self, job: Job):
+        """Wake up any threads waiting for job updates."""
+        with self.update_condition:
+            self.version += 1
+            self.update_condition.notify_all()
+
+    def wait_for_job_update(self, job: Job, last_version: int, timeout: float) -> int:
+        """Block until the job changes or the timeout expires.
+
+        Args:
+            job: The job to watch
+            last_version: The job version the caller has already seen
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            The current job version
+        """
+        with self.update_condition:
+            self.update_condition.wait_for(lambda: job.version != last_version, timeout=timeout)
+        return job.version
+
     def get_active_jobs(self) -> List[Job]:
         """Get all active jobs.
 
@@ -218,11 +365,11 @@ class TaskMaster:
             List of completed jobs
         """
         with self.lock:
-            completed = [job for job in self.jobs.values()
-                        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)]
-            # Sort by end_time (most recent first)
-            completed.sort(key=lambda j: j.end_time if j.end_time else datetime.min, reverse=True)
-            return completed[:limit]
+            # Jobs are stored in creation order and run one at a time, so walking
+            # the dictionary backwards yields the most recent jobs first
+            completed = (job for job in reversed(self.jobs.values())
+                        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED))
+            return list(islice(completed, limit))
 
     def get_worker_status(self) -> Dict[str, Any]:
         """Get the status of the worker thread.
@@ -230,25 +377,27 @@ class TaskMaster:
         Returns:
             Dictionary with worker thread status information
         """
-        with self.lock:
-            current_time = time.time()
-            last_worker_activity_seconds_ago = current_time - self.last_worker_activity
-            last_monitor_activity_seconds_ago = current_time - self.last_monitor_activity
-            last_supervisor_activity_seconds_ago = current_time - self.last_supervisor_activity
+        # Read without taking self.lock: the activity timestamps are single float
+        # assignments and list() copies the job values atomically, so this never
+        # waits behind the worker thread.
+        current_time = time.time()
+        last_worker_activity_seconds_ago = current_time - self.last_worker_activity
+        last_monitor_activity_seconds_ago = current_time - self.last_monitor_activity
+        last_supervisor_activity_seconds_ago = current_time - self.last_supervisor_activity
+        jobs = list(self.jobs.values())
 
-            return {
-                "worker_alive": self.worker_thread.is_alive(),
-                "monitor_alive": self.monitor_thread.is_alive(),
-                "supervisor_alive": self.supervisor_thread.is_alive(),
-                "last_worker_activity_seconds_ago": int(last_worker_activity_seconds_ago),
-                "last_monitor_activity_seconds_ago": int(last_monitor_activity_seconds_ago),
-                "last_supervisor_activity_seconds_ago": int(last_supervisor_activity_seconds_ago),
-                "active_job": self.active_job,
-                "pending_jobs_count": len([job for job in self.jobs.values()
-                                         if job.status == JobStatus.PENDING]),
-                "queue_size": self.job_queue.qsize(),
-                "queue_empty": self.job_queue.empty()
-            }
+        return {
+            "worker_alive": self.worker_thread.is_alive(),
+            "monitor_alive": self.monitor_thread.is_alive(),
+            "supervisor_alive": self.supervisor_thread.is_alive(),
+            "last_worker_activity_seconds_ago": int(last_worker_activity_seconds_ago),
+            "last_monitor_activity_seconds_ago": int(last_monitor_activity_seconds_ago),
+            "last_supervisor_activity_seconds_ago": int(last_supervisor_activity_seconds_ago),
+            "active_job": self.active_job,
+            "pending_jobs_count": sum(1 for job in jobs if job.status == JobStatus.PENDING),
+            "queue_size": self.job_queue.qsize(),
+            "queue_empty": self.job_queue.empty()
+        }
 
     def restart_worker(self) -> Dict[str, Any]:
         """Restart the worker thread.
@@ -503,9 +652,16 @@ class TaskMaster:
                     cmd.append(f"--{key.replace('_', '-')}")
                     cmd.append(str(value))
 
-            # Add fixed parameters for stability
-            cmd.append("--workers")
-            cmd.append("1")
+            # Add fixed parameters for stability. The attendance scraper's thread
+            # mode shares one logged-in requests session and never starts a
+            # browser, so it can safely fetch a few combinations at once; a job
+            # may ask for a different worker count.
+            attendance_workers = int(job.params.get("workers") or ATTENDANCE_WORKERS)
+            if script_name == "attendance_scraper.py" and attendance_workers > 1:
+                cmd.extend(["--workers", str(attendance_workers), "--worker-mode", "thread"])
+            else:
+                cmd.append("--workers")
+                cmd.append("1")
             cmd.append("--max-retries")
             cmd.append("5")
             cmd.append("--timeout")
@@ -521,9 +677,11 @@ class TaskMaster:
             # Log the command
             job.add_log(f"Running command: {' '.join(cmd)}")
 
-            # Run the command
+            # Run the command. The child writes to a pipe, so force unbuffered output
+            # to have log lines show up as they are printed rather than in blocks.
             process = subprocess.Popen(
-                cmd,
+                NICE_PREFIX + cmd,
+                env={**os.environ, 'PYTHONUNBUFFERED': '1'},
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,